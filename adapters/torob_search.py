@@ -4,13 +4,22 @@ Handles search queries, pagination, and product detail extraction.
 """
 
 import asyncio
+import contextvars
+import json
 import random
+import re
 import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from urllib.parse import quote
 
-from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Locator,
+    Page,
+    async_playwright,
+)
 
 from core.cache_manager import get_cache
 from core.config_manager import get_config
@@ -24,18 +33,142 @@ from utils.text import (
 )
 
 
+def _parse_search_page_json(
+    page_content: str, base_url: str
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Extract products from the __NEXT_DATA__ JSON embedded in a search page.
+
+    Args:
+        page_content: Search page HTML
+        base_url: Base URL for relative product links
+
+    Returns:
+        List of product dictionaries, or None if the page has no usable JSON
+    """
+    # Look for the JSON data in script tags - use the working pattern
+    json_match = re.search(
+        r"<script[^>]*>.*?__NEXT_DATA__.*?({.*?})</script>",
+        page_content,
+        re.DOTALL,
+    )
+    if not json_match:
+        return None
+
+    try:
+        json_data = json.loads(json_match.group(1))
+    except json.JSONDecodeError as e:
+        print(f"JSON decode error: {e}")
+        # Fall back to CSS selectors
+        return None
+
+    print(f"✅ Successfully parsed JSON data")
+
+    # Extract products from the JSON data - correct path
+    products = json_data.get("props", {}).get("pageProps", {}).get("products", [])
+
+    if not products:
+        return None
+
+    print(f"Found {len(products)} products in JSON data")
+    all_products = []
+
+    for product in products:
+        try:
+            # Extract data from JSON structure
+            title_raw = product.get("name1", "") or product.get("name2", "")
+            price_raw = product.get("price", 0)
+            price_text = product.get("price_text", "")
+            product_url = product.get("web_client_absolute_url", "")
+            shop_text = product.get("shop_text", "")
+            stock_status = product.get("stock_status", "")
+
+            # Convert price to number
+            if price_raw and price_raw > 0:
+                price_raw = int(price_raw)
+            else:
+                price_raw = 0
+
+            # Detect currency
+            currency_unit = (
+                detect_currency_unit(price_text) if price_text else "unknown"
+            )
+
+            # Extract seller name from shop_text
+            seller_name = ""
+            if shop_text:
+                # Extract seller name from "در فروشگاه" text
+                seller_match = re.search(r"در\s+([^،]+)", shop_text)
+                if seller_match:
+                    seller_name = seller_match.group(1).strip()
+
+            # Build full URL
+            if product_url and not product_url.startswith("http"):
+                product_url = f"{base_url}{product_url}"
+
+            if title_raw or price_raw:
+                product_data = {
+                    "title_raw": title_raw,
+                    "price_raw": price_raw,
+                    "price_text": price_text,
+                    "currency_unit": currency_unit,
+                    "seller_name": seller_name,
+                    "product_url": product_url,
+                    "seller_url": "",  # Not available in search results
+                    "availability": stock_status,
+                    "snapshot_ts": datetime.now().isoformat(),
+                }
+                all_products.append(product_data)
+
+        except Exception as e:
+            print(f"Error processing product from JSON: {e}")
+            continue
+
+    print(f"Total products extracted from JSON: {len(all_products)}")
+
+    return all_products
+
+
+async def launch_browser(playwright, headless: Optional[bool] = None) -> Browser:
+    """
+    Launch the Chromium browser the scrapers run in.
+
+    Args:
+        playwright: Started Playwright instance
+        headless: Run browser in headless mode (defaults to config)
+
+    Returns:
+        Launched browser
+    """
+    if headless is None:
+        headless = get_config().get("browser.headless", True)
+    return await playwright.chromium.launch(
+        headless=headless, args=["--no-sandbox", "--disable-dev-shm-usage"]
+    )
+
+
 class TorobScraper:
     """
     Scraper for Torob.com marketplace.
     """
 
-    def __init__(self, headless: bool = None, delay_range: tuple = None):
+    def __init__(
+        self,
+        headless: bool = None,
+        delay_range: tuple = None,
+        shared_context: Optional[BrowserContext] = None,
+        shared_browser: Optional[Browser] = None,
+    ):
         """
         Initialize Torob scraper.
 
         Args:
             headless: Run browser in headless mode (overrides config)
             delay_range: Random delay range between requests (seconds) (overrides config)
+            shared_context: Browser context of another scraper to open a page in,
+                instead of launching a browser of our own
+            shared_browser: Already launched browser to open our own context
+                in; it is left running on close
         """
         self.config = get_config()
         self.cache = get_cache()
@@ -51,6 +184,8 @@ class TorobScraper:
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self.shared_context = shared_context
+        self.shared_browser = shared_browser
 
         # CSS selectors for Torob elements (updated based on actual page structure)
         self.selectors = {
@@ -64,6 +199,9 @@ class TorobScraper:
             "load_more": '.load-more, .show-more, [data-testid="load-more"]',
             "no_results": ".no-results, .empty-state, .no-products",
         }
+        # Page locators by selector string. Locators resolve lazily on each
+        # action, so they stay valid across navigations.
+        self._locators: Dict[str, Locator] = {}
 
     async def __aenter__(self):
         """Async context manager entry."""
@@ -76,7 +214,12 @@ class TorobScraper:
 
     async def start(self):
         """Start the browser and create context."""
-        self.playwright = await async_playwright().start()
+        if self.shared_context is not None:
+            # Pages of one context share its connection pool and HTTP cache
+            self.context = self.shared_context
+            self.page = await self.context.new_page()
+            return
+
         # Get browser configuration
         browser_config = self.config.get_browser_config()
         viewport = browser_config.get("viewport", {"width": 1920, "height": 1080})
@@ -85,10 +228,13 @@ class TorobScraper:
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
         )
 
-        self.browser = await self.playwright.chromium.launch(
-            headless=self.headless, args=["--no-sandbox", "--disable-dev-shm-usage"]
-        )
-        self.context = await self.browser.new_context(
+        if self.shared_browser is not None:
+            browser = self.shared_browser
+        else:
+            self.playwright = await async_playwright().start()
+            self.browser = await launch_browser(self.playwright, self.headless)
+            browser = self.browser
+        self.context = await browser.new_context(
             user_agent=user_agent, viewport=viewport
         )
         self.page = await self.context.new_page()
@@ -97,6 +243,9 @@ class TorobScraper:
         """Close the browser and cleanup."""
         if self.page:
             await self.page.close()
+        if self.shared_context is not None:
+            # The owning scraper closes the context and browser
+            return
         if self.context:
             await self.context.close()
         if self.browser:
@@ -104,6 +253,21 @@ class TorobScraper:
         if hasattr(self, "playwright"):
             await self.playwright.stop()
 
+    def _locator(self, selector: str) -> Locator:
+        """
+        Get a locator for a selector on the page, reusing it across calls.
+
+        Args:
+            selector: CSS selector
+
+        Returns:
+            Locator for the selector
+        """
+        locator = self._locators.get(selector)
+        if locator is None:
+            locator = self._locators[selector] = self.page.locator(selector)
+        return locator
+
     async def _random_delay(self):
         """Add random delay between requests."""
         delay = random.uniform(*self.delay_range)
@@ -118,7 +282,7 @@ class TorobScraper:
         """
         try:
             # Get current product count
-            current_products = await self.page.locator(
+            current_products = await self._locator(
                 self.selectors["product_cards"]
             ).count()
 
@@ -134,15 +298,13 @@ class TorobScraper:
             await asyncio.sleep(scroll_delay)
 
             # Check if load more button exists and click it
-            load_more_button = self.page.locator(self.selectors["load_more"])
+            load_more_button = self._locator(self.selectors["load_more"])
             if await load_more_button.count() > 0:
                 await load_more_button.click()
                 await asyncio.sleep(scroll_pause)
 
             # Check if new products loaded
-            new_products = await self.page.locator(
-                self.selectors["product_cards"]
-            ).count()
+            new_products = await self._locator(self.selectors["product_cards"]).count()
 
             return new_products > current_products
 
@@ -356,106 +518,24 @@ class TorobScraper:
                 # Get the page content and extract JSON data
                 page_content = await self.page.content()
 
-                # Look for the JSON data in script tags - use the working pattern
-                import re
-
-                json_match = re.search(
-                    r"<script[^>]*>.*?__NEXT_DATA__.*?({.*?})</script>",
+                # Parsing the page is CPU-bound; run it off the event loop so
+                # other pages keep loading meanwhile
+                loop = asyncio.get_running_loop()
+                # Copy the context so the parser's printed output stays
+                # attributed to the task that started this search
+                all_products = await loop.run_in_executor(
+                    None,
+                    contextvars.copy_context().run,
+                    _parse_search_page_json,
                     page_content,
-                    re.DOTALL,
+                    self.base_url,
                 )
-                if json_match:
-                    import json
-
-                    try:
-                        json_data = json.loads(json_match.group(1))
-                        print(f"✅ Successfully parsed JSON data")
-
-                        # Extract products from the JSON data - correct path
-                        products = (
-                            json_data.get("props", {})
-                            .get("pageProps", {})
-                            .get("products", [])
-                        )
 
-                        if products:
-                            print(f"Found {len(products)} products in JSON data")
-                            all_products = []
+                if all_products is not None:
+                    # Cache the results
+                    self.cache.set_search_results(keywords, all_products)
 
-                            for product in products:
-                                try:
-                                    # Extract data from JSON structure
-                                    title_raw = product.get("name1", "") or product.get(
-                                        "name2", ""
-                                    )
-                                    price_raw = product.get("price", 0)
-                                    price_text = product.get("price_text", "")
-                                    product_url = product.get(
-                                        "web_client_absolute_url", ""
-                                    )
-                                    shop_text = product.get("shop_text", "")
-                                    stock_status = product.get("stock_status", "")
-
-                                    # Convert price to number
-                                    if price_raw and price_raw > 0:
-                                        price_raw = int(price_raw)
-                                    else:
-                                        price_raw = 0
-
-                                    # Detect currency
-                                    currency_unit = (
-                                        detect_currency_unit(price_text)
-                                        if price_text
-                                        else "unknown"
-                                    )
-
-                                    # Extract seller name from shop_text
-                                    seller_name = ""
-                                    if shop_text:
-                                        # Extract seller name from "در فروشگاه" text
-                                        seller_match = re.search(
-                                            r"در\s+([^،]+)", shop_text
-                                        )
-                                        if seller_match:
-                                            seller_name = seller_match.group(1).strip()
-
-                                    # Build full URL
-                                    if product_url and not product_url.startswith(
-                                        "http"
-                                    ):
-                                        product_url = f"{self.base_url}{product_url}"
-
-                                    if title_raw or price_raw:
-                                        product_data = {
-                                            "title_raw": title_raw,
-                                            "price_raw": price_raw,
-                                            "price_text": price_text,
-                                            "currency_unit": currency_unit,
-                                            "seller_name": seller_name,
-                                            "product_url": product_url,
-                                            "seller_url": "",  # Not available in search results
-                                            "availability": stock_status,
-                                            "snapshot_ts": datetime.now().isoformat(),
-                                        }
-                                        all_products.append(product_data)
-
-                                except Exception as e:
-                                    print(f"Error processing product from JSON: {e}")
-                                    continue
-
-                            print(
-                                f"Total products extracted from JSON: {len(all_products)}"
-                            )
-
-                            # Cache the results
-                            self.cache.set_search_results(keywords, all_products)
-
-                            return all_products
-
-                    except json.JSONDecodeError as e:
-                        print(f"JSON decode error: {e}")
-                        # Fall back to CSS selectors
-                        pass
+                    return all_products
 
             except Exception as e:
                 print(f"Error extracting JSON data: {e}")
@@ -464,7 +544,7 @@ class TorobScraper:
             print("Falling back to CSS selector method...")
 
             # Check for no results
-            no_results = self.page.locator(self.selectors["no_results"])
+            no_results = self._locator(self.selectors["no_results"])
             if await no_results.count() > 0:
                 print("No results found")
                 return []
@@ -475,7 +555,7 @@ class TorobScraper:
 
             while scroll_attempts < max_scroll_attempts:
                 # Extract current products
-                product_cards = self.page.locator(self.selectors["product_cards"])
+                product_cards = self._locator(self.selectors["product_cards"])
                 card_count = await product_cards.count()
 
                 print(f"Found {card_count} product cards on page")
@@ -564,7 +644,7 @@ class TorobScraper:
 
             for selector in offer_selectors:
                 try:
-                    cards = self.page.locator(selector)
+                    cards = self._locator(selector)
                     count = await cards.count()
                     if count > 0:
                         offer_cards = cards
@@ -77,6 +77,7 @@ class ConfigManager:
             "export": {
                 "excel": {
                     "filename_template": "{part_name}.xlsx",
+                    "streaming": False,
                     "sheets": {
                         "offers_raw": "offers_raw",
                         "sellers_summary": "sellers_summary",
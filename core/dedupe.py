@@ -3,12 +3,24 @@ Deduplication and seller normalization module.
 Handles offer deduplication and seller name standardization.
 """
 
-import hashlib
 from collections import defaultdict
 from typing import Any, Dict, List, Set, Tuple
 
 from utils.text import clean_whitespace, normalize_part_title, normalize_seller_name
 
+# Every offer field that deduplicate_offers reads. Offers that agree on all of
+# them are interchangeable there, and only the first one can survive.
+_DEDUPE_FIELDS = (
+    "part_id",
+    "seller_name",
+    "title_raw",
+    "price_raw",
+    "product_url",
+    "seller_url",
+    "availability",
+    "currency_unit",
+)
+
 
 class OfferDeduplicator:
     """
@@ -18,6 +30,7 @@ class OfferDeduplicator:
     def __init__(self):
         self.seller_mappings = {}  # Maps variations to canonical seller names
         self.seen_offers = set()  # Tracks unique offer signatures
+        self._seller_cache = {}  # Raw seller name -> normalized, mapped name
 
     def _normalize_seller(self, seller_name: str) -> str:
         """
@@ -32,16 +45,21 @@ class OfferDeduplicator:
         if not seller_name:
             return "UNKNOWN_SELLER"
 
+        # Pairwise dedup normalizes the same few sellers over and over
+        cached = self._seller_cache.get(seller_name)
+        if cached is not None:
+            return cached
+
         # Basic normalization
         normalized = normalize_seller_name(seller_name)
 
         # Apply known mappings
-        if normalized in self.seller_mappings:
-            return self.seller_mappings[normalized]
+        normalized = self.seller_mappings.get(normalized, normalized)
 
+        self._seller_cache[seller_name] = normalized
         return normalized
 
-    def _create_offer_signature(self, offer: Dict[str, Any]) -> str:
+    def _create_offer_signature(self, offer: Dict[str, Any]) -> Tuple[Any, ...]:
         """
         Create a unique signature for an offer to detect duplicates.
 
@@ -49,7 +67,7 @@ class OfferDeduplicator:
             offer: Offer dictionary
 
         Returns:
-            Unique signature string
+            Hashable signature tuple
         """
         # Components for signature
         seller_norm = self._normalize_seller(offer.get("seller_name", ""))
@@ -57,11 +75,9 @@ class OfferDeduplicator:
         price = offer.get("price_raw", 0) or 0
         part_id = offer.get("part_id", 0)
 
-        # Create signature from key components
-        signature_data = f"{part_id}:{seller_norm}:{title_norm}:{price}"
-        signature = hashlib.md5(signature_data.encode()).hexdigest()
-
-        return signature
+        # The components themselves are the signature; it is only used as a
+        # dict key, so there's nothing to gain from digesting them
+        return (part_id, seller_norm, title_norm, price)
 
     def _is_similar_offer(self, offer1: Dict[str, Any], offer2: Dict[str, Any]) -> bool:
         """
@@ -136,6 +152,32 @@ class OfferDeduplicator:
             variation_norm = normalize_seller_name(variation)
             self.seller_mappings[variation_norm] = canonical_norm
 
+        # Cached names may resolve differently now
+        self._seller_cache.clear()
+
+    def drop_exact_duplicates(
+        self, offers: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Cheaply drop offers that deduplicate_offers would discard anyway.
+
+        Args:
+            offers: List of offer dictionaries
+
+        Returns:
+            Offers in their original order, keeping the first of each exact repeat
+        """
+        seen = set()
+        unique_offers = []
+
+        for offer in offers:
+            key = tuple([offer.get(field) for field in _DEDUPE_FIELDS])
+            if key not in seen:
+                seen.add(key)
+                unique_offers.append(offer)
+
+        return unique_offers
+
     def deduplicate_offers(self, offers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Remove duplicate offers from the list.
@@ -259,7 +259,18 @@ class PartNormalizer:
         Returns:
             Tuple of (is_valid, list_of_issues)
         """
-        metadata = self.extract_metadata(part_name, part_code)
+        return self.validate_metadata(self.extract_metadata(part_name, part_code))
+
+    def validate_metadata(self, metadata: Dict[str, str]) -> Tuple[bool, list]:
+        """
+        Validate already extracted metadata and return any issues.
+
+        Args:
+            metadata: Result of extract_metadata
+
+        Returns:
+            Tuple of (is_valid, list_of_issues)
+        """
         issues = []
 
         if metadata["part_type"] == "UNKNOWN":
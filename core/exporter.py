@@ -9,7 +9,9 @@ from typing import Any, Dict, List, Optional
 
 import numpy as np
 import pandas as pd
+import xlsxwriter
 
+from core.config_manager import get_config
 from utils.text import convert_toman_to_rial, format_price
 
 
@@ -18,14 +20,21 @@ class ExcelExporter:
     Handles Excel export with multiple sheets and formatting.
     """
 
-    def __init__(self, output_file: str = "torob_prices.xlsx"):
+    def __init__(self, output_file: str = "torob_prices.xlsx", streaming: bool = None):
         """
         Initialize Excel exporter.
 
         Args:
             output_file: Output Excel file path
+            streaming: Write sheets row by row in constant memory
+                (overrides config)
         """
         self.output_file = output_file
+        self.streaming = (
+            streaming
+            if streaming is not None
+            else get_config().get("export.excel.streaming", False)
+        )
         self.writer = None
 
     def __enter__(self):
@@ -37,12 +46,40 @@ class ExcelExporter:
         if self.writer:
             self.writer.close()
 
-    def _prepare_offers_data(self, offers: List[Dict[str, Any]]) -> pd.DataFrame:
+    def _prices_toman(self, offers: List[Dict[str, Any]]) -> List[int]:
+        """
+        Compute the Toman price of every offer.
+
+        Args:
+            offers: List of offer dictionaries
+
+        Returns:
+            Prices in Toman, aligned with offers (0 if missing)
+        """
+        prices = []
+
+        for offer in offers:
+            price_toman = offer.get("price_raw", 0) or 0
+
+            # Detect if price is in Rial and convert to Toman
+            if offer.get("currency_unit", "unknown") == "rial" and price_toman > 0:
+                price_toman = price_toman // 10
+
+            prices.append(price_toman)
+
+        return prices
+
+    def _prepare_offers_data(
+        self,
+        offers: List[Dict[str, Any]],
+        prices_toman: Optional[List[int]] = None,
+    ) -> pd.DataFrame:
         """
         Prepare offers data for the raw offers sheet.
 
         Args:
             offers: List of offer dictionaries
+            prices_toman: Precomputed _prices_toman(offers), if available
 
         Returns:
             DataFrame with offers data
@@ -50,18 +87,14 @@ class ExcelExporter:
         if not offers:
             return pd.DataFrame()
 
+        if prices_toman is None:
+            prices_toman = self._prices_toman(offers)
+
         # Prepare data rows
         rows = []
 
-        for offer in offers:
-            # Calculate prices in both Toman and Rial
-            price_toman = offer.get("price_raw", 0) or 0
-
-            # Detect if price is in Rial and convert to Toman
-            currency_unit = offer.get("currency_unit", "unknown")
-            if currency_unit == "rial" and price_toman > 0:
-                price_toman = price_toman // 10
-
+        for offer, price_toman in zip(offers, prices_toman):
+            # Toman price is precomputed; derive the Rial one
             price_rial = convert_toman_to_rial(price_toman)
 
             row = {
@@ -89,12 +122,17 @@ class ExcelExporter:
 
         return df
 
-    def _prepare_sellers_summary(self, offers: List[Dict[str, Any]]) -> pd.DataFrame:
+    def _prepare_sellers_summary(
+        self,
+        offers: List[Dict[str, Any]],
+        prices_toman: Optional[List[int]] = None,
+    ) -> pd.DataFrame:
         """
         Prepare seller summary data.
 
         Args:
             offers: List of offer dictionaries
+            prices_toman: Precomputed _prices_toman(offers), if available
 
         Returns:
             DataFrame with seller summary
@@ -102,10 +140,13 @@ class ExcelExporter:
         if not offers:
             return pd.DataFrame()
 
+        if prices_toman is None:
+            prices_toman = self._prices_toman(offers)
+
         # Group by seller
         seller_groups = {}
 
-        for offer in offers:
+        for offer, price_toman in zip(offers, prices_toman):
             seller_norm = offer.get("seller_name_norm", "UNKNOWN_SELLER")
 
             if seller_norm not in seller_groups:
@@ -114,11 +155,6 @@ class ExcelExporter:
             seller_groups[seller_norm]["offers"].append(offer)
 
             # Add price if valid
-            price_toman = offer.get("price_raw", 0) or 0
-            currency_unit = offer.get("currency_unit", "unknown")
-            if currency_unit == "rial" and price_toman > 0:
-                price_toman = price_toman // 10
-
             if price_toman > 0:
                 seller_groups[seller_norm]["prices"].append(price_toman)
 
@@ -150,12 +186,17 @@ class ExcelExporter:
 
         return df
 
-    def _prepare_parts_summary(self, offers: List[Dict[str, Any]]) -> pd.DataFrame:
+    def _prepare_parts_summary(
+        self,
+        offers: List[Dict[str, Any]],
+        prices_toman: Optional[List[int]] = None,
+    ) -> pd.DataFrame:
         """
         Prepare parts summary with analytics.
 
         Args:
             offers: List of offer dictionaries
+            prices_toman: Precomputed _prices_toman(offers), if available
 
         Returns:
             DataFrame with parts summary
@@ -163,10 +204,13 @@ class ExcelExporter:
         if not offers:
             return pd.DataFrame()
 
+        if prices_toman is None:
+            prices_toman = self._prices_toman(offers)
+
         # Group by part
         part_groups = {}
 
-        for offer in offers:
+        for offer, price_toman in zip(offers, prices_toman):
             part_key = offer.get("part_key", "UNKNOWN")
             part_id = offer.get("part_id", 0)
 
@@ -183,11 +227,6 @@ class ExcelExporter:
             part_groups[part_id]["offers"].append(offer)
 
             # Add price if valid
-            price_toman = offer.get("price_raw", 0) or 0
-            currency_unit = offer.get("currency_unit", "unknown")
-            if currency_unit == "rial" and price_toman > 0:
-                price_toman = price_toman // 10
-
             if price_toman > 0:
                 part_groups[part_id]["prices"].append(price_toman)
 
@@ -321,12 +360,22 @@ class ExcelExporter:
         """
         print(f"Exporting {len(offers)} offers to Excel: {self.output_file}")
 
-        # Prepare data for each sheet
-        offers_df = self._prepare_offers_data(offers)
-        sellers_df = self._prepare_sellers_summary(offers)
-        parts_df = self._prepare_parts_summary(offers)
-
-        # Create Excel file with multiple sheets
+        # Prepare data for each sheet, converting prices only once
+        prices_toman = self._prices_toman(offers)
+        offers_df = self._prepare_offers_data(offers, prices_toman)
+        sellers_df = self._prepare_sellers_summary(offers, prices_toman)
+        parts_df = self._prepare_parts_summary(offers, prices_toman)
+
+        if self.streaming:
+            self._export_streaming(offers_df, sellers_df, parts_df)
+            print(f"Excel file created successfully: {self.output_file}")
+            self._print_export_summary(offers_df, sellers_df, parts_df)
+            return self.output_file
+
+        # Create Excel file with multiple sheets. xlsxwriter's constant_memory
+        # mode is not an option here: pandas writes each sheet column by
+        # column, and constant_memory silently drops cells written to rows it
+        # has already flushed.
         with pd.ExcelWriter(self.output_file, engine="xlsxwriter") as writer:
             # Write sheets
             if not offers_df.empty:
@@ -341,6 +390,16 @@ class ExcelExporter:
             # Get workbook and worksheets for formatting
             workbook = writer.book
 
+            # One shared header format for every sheet
+            header_format = workbook.add_format(
+                {
+                    "bold": True,
+                    "font_color": "white",
+                    "bg_color": "#366092",
+                    "border": 1,
+                }
+            )
+
             # Apply formatting to each sheet
             for sheet_name in writer.sheets:
                 worksheet = writer.sheets[sheet_name]
@@ -367,16 +426,6 @@ class ExcelExporter:
                         )
                         worksheet.set_column(i, i, min(max_len + 2, 30))
 
-                # Format headers
-                header_format = workbook.add_format(
-                    {
-                        "bold": True,
-                        "font_color": "white",
-                        "bg_color": "#366092",
-                        "border": 1,
-                    }
-                )
-
                 # Apply header format
                 if sheet_name == "offers_raw" and not offers_df.empty:
                     for col_num, value in enumerate(offers_df.columns.values):
@@ -392,15 +441,73 @@ class ExcelExporter:
                 worksheet.freeze_panes(1, 0)
 
         print(f"Excel file created successfully: {self.output_file}")
+        self._print_export_summary(offers_df, sellers_df, parts_df)
+
+        return self.output_file
 
-        # Print summary statistics
+    def _export_streaming(
+        self, offers_df: pd.DataFrame, sellers_df: pd.DataFrame, parts_df: pd.DataFrame
+    ):
+        """
+        Write the sheets with xlsxwriter in constant memory mode.
+
+        Rows are flushed to disk as they are written instead of the whole
+        workbook being held in memory. The sheets are already built, so
+        column widths are worked out up front and the output matches the
+        DataFrame export.
+
+        Args:
+            offers_df: Raw offers sheet
+            sellers_df: Seller summary sheet
+            parts_df: Part summary sheet
+        """
+        workbook = xlsxwriter.Workbook(
+            self.output_file, {"constant_memory": True, "use_zip64": True}
+        )
+        try:
+            header_format = workbook.add_format(
+                {
+                    "bold": True,
+                    "font_color": "white",
+                    "bg_color": "#366092",
+                    "border": 1,
+                }
+            )
+
+            for sheet_name, df, max_width in (
+                ("offers_raw", offers_df, 50),
+                ("sellers_summary", sellers_df, 40),
+                ("part_summary", parts_df, 30),
+            ):
+                if df.empty:
+                    continue
+                worksheet = workbook.add_worksheet(sheet_name)
+
+                # Column widths must be set before any row is written
+                for i, col in enumerate(df.columns):
+                    max_len = max(df[col].astype(str).str.len().max(), len(str(col)))
+                    worksheet.set_column(i, i, min(max_len + 2, max_width))
+
+                worksheet.write_row(0, 0, list(df.columns), header_format)
+                for row_idx, values in enumerate(
+                    df.itertuples(index=False, name=None), start=1
+                ):
+                    worksheet.write_row(row_idx, 0, values)
+
+                # Freeze header row
+                worksheet.freeze_panes(1, 0)
+        finally:
+            workbook.close()
+
+    def _print_export_summary(
+        self, offers_df: pd.DataFrame, sellers_df: pd.DataFrame, parts_df: pd.DataFrame
+    ):
+        """Print the row counts of the exported sheets."""
         print(f"\nExport Summary:")
         print(f"- Raw offers: {len(offers_df)} rows")
         print(f"- Unique sellers: {len(sellers_df)} sellers")
         print(f"- Unique parts: {len(parts_df)} parts")
 
-        return self.output_file
-
 
 def test_exporter():
     """Test the Excel exporter with sample data."""
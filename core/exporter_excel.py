@@ -3,12 +3,14 @@ Enhanced Excel exporter with hyperlinks and conditional formatting.
 Creates professional multi-sheet Excel files with advanced formatting.
 """
 
+import os
 from datetime import datetime
 from statistics import median, stdev
 from typing import Any, Dict, List
 
 import numpy as np
 import pandas as pd
+import xlsxwriter
 
 from core.config_manager import get_config
 from utils.text import convert_toman_to_rial, format_price
@@ -19,17 +21,73 @@ class ExcelExporter:
     Enhanced Excel exporter with hyperlinks and conditional formatting.
     """
 
-    def __init__(self, output_file: str = None):
+    def __init__(self, output_file: str = None, streaming: bool = None):
         """
         Initialize Excel exporter.
 
         Args:
             output_file: Output Excel file path (overrides config)
+            streaming: Write raw offers row by row in constant memory
+                (overrides config)
         """
         self.config = get_config()
         self.output_file = output_file or self.config.get(
             "export.excel.filename_template", "torob_prices.xlsx"
         )
+        self.streaming = (
+            streaming
+            if streaming is not None
+            else self.config.get("export.excel.streaming", False)
+        )
+
+    def _offer_row(self, offer: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the raw offers sheet row for one offer.
+
+        Args:
+            offer: Offer dictionary
+
+        Returns:
+            Row dictionary keyed by column name
+        """
+        # Prepare URLs for validation
+        product_url = offer.get("product_url", "")
+        seller_url = offer.get("seller_url", "")
+
+        # Create validation URLs
+        validation_urls = []
+        if product_url:
+            validation_urls.append(f"Product: {product_url}")
+        if seller_url:
+            validation_urls.append(f"Seller: {seller_url}")
+
+        validation_url_text = (
+            "\n".join(validation_urls) if validation_urls else "No URLs available"
+        )
+
+        return {
+            "part_id": offer.get("part_id", ""),
+            "part_name": offer.get("part_name", ""),
+            "part_code": offer.get("part_code", ""),
+            "query": offer.get("query", ""),
+            "part_key": offer.get("part_key", ""),
+            "part_name_norm": offer.get("part_name_norm", ""),
+            "title_raw": offer.get("title_raw", ""),
+            "price_raw": offer.get("price_raw", 0),
+            "price_text": offer.get("price_text", ""),
+            "currency_unit": offer.get("currency_unit", ""),
+            "seller_name": offer.get("seller_name", ""),
+            "seller_name_norm": offer.get("seller_name_norm", ""),
+            "price_toman": offer.get("price_toman", 0),
+            "price_rial": offer.get("price_rial", 0),
+            "product_url": product_url,
+            "seller_url": seller_url,
+            "validation_urls": validation_url_text,
+            "relevance": offer.get("relevance", 0.0),
+            "snapshot_ts": offer.get("snapshot_ts", datetime.now().isoformat()),
+            "price_missing": offer.get("price_missing", 0),
+            "drilled_down": offer.get("drilled_down", False),
+        }
 
     def _prepare_offers_data(self, offers: List[Dict[str, Any]]) -> pd.DataFrame:
         """
@@ -45,49 +103,7 @@ class ExcelExporter:
             return pd.DataFrame()
 
         # Prepare data rows
-        rows = []
-
-        for offer in offers:
-            # Prepare URLs for validation
-            product_url = offer.get("product_url", "")
-            seller_url = offer.get("seller_url", "")
-
-            # Create validation URLs
-            validation_urls = []
-            if product_url:
-                validation_urls.append(f"Product: {product_url}")
-            if seller_url:
-                validation_urls.append(f"Seller: {seller_url}")
-
-            validation_url_text = (
-                "\n".join(validation_urls) if validation_urls else "No URLs available"
-            )
-
-            row = {
-                "part_id": offer.get("part_id", ""),
-                "part_name": offer.get("part_name", ""),
-                "part_code": offer.get("part_code", ""),
-                "query": offer.get("query", ""),
-                "part_key": offer.get("part_key", ""),
-                "part_name_norm": offer.get("part_name_norm", ""),
-                "title_raw": offer.get("title_raw", ""),
-                "price_raw": offer.get("price_raw", 0),
-                "price_text": offer.get("price_text", ""),
-                "currency_unit": offer.get("currency_unit", ""),
-                "seller_name": offer.get("seller_name", ""),
-                "seller_name_norm": offer.get("seller_name_norm", ""),
-                "price_toman": offer.get("price_toman", 0),
-                "price_rial": offer.get("price_rial", 0),
-                "product_url": product_url,
-                "seller_url": seller_url,
-                "validation_urls": validation_url_text,
-                "relevance": offer.get("relevance", 0.0),
-                "snapshot_ts": offer.get("snapshot_ts", datetime.now().isoformat()),
-                "price_missing": offer.get("price_missing", 0),
-                "drilled_down": offer.get("drilled_down", False),
-            }
-
-            rows.append(row)
+        rows = [self._offer_row(offer) for offer in offers]
 
         df = pd.DataFrame(rows)
 
@@ -285,8 +301,6 @@ class ExcelExporter:
             # Define formats
             outlier_format = workbook.add_format({"bg_color": "#ffcccc", "border": 1})
 
-            normal_format = workbook.add_format({"border": 1})
-
             # Get AMP column for outlier detection
             if "AMP_toman" in df.columns:
                 amp_values = df["AMP_toman"].values
@@ -297,7 +311,8 @@ class ExcelExporter:
                     std_amp = np.std(valid_amps)
                     outlier_threshold = 2 * std_amp
 
-                    # Apply conditional formatting to price columns
+                    # Only rewrite outlier cells; the rest keep the values and
+                    # column formats already written by to_excel/set_column
                     for col_idx, col_name in enumerate(df.columns):
                         if "price" in col_name.lower() and col_name != "price_std_dev":
                             for row_idx in range(1, len(df) + 1):  # Skip header
@@ -309,22 +324,27 @@ class ExcelExporter:
                                     worksheet.write(
                                         row_idx, col_idx, cell_value, outlier_format
                                     )
-                                else:
-                                    worksheet.write(
-                                        row_idx, col_idx, cell_value, normal_format
-                                    )
 
-    def export_to_excel(self, offers: List[Dict[str, Any]]) -> str:
+    def export_to_excel(self, offers: List[Dict[str, Any]], suffix: str = "") -> str:
         """
         Export offers data to Excel with multiple sheets and advanced formatting.
 
         Args:
             offers: List of offer dictionaries
+            suffix: Text inserted before the file extension, e.g. "_part1"
 
         Returns:
             Path to the created Excel file
         """
-        print(f"Exporting {len(offers)} offers to Excel: {self.output_file}")
+        output_file = self.output_file
+        if suffix:
+            root, ext = os.path.splitext(output_file)
+            output_file = f"{root}{suffix}{ext}"
+
+        print(f"Exporting {len(offers)} offers to Excel: {output_file}")
+
+        if self.streaming:
+            return self._export_streaming(offers, output_file)
 
         # Prepare data for each sheet
         offers_df = self._prepare_offers_data(offers)
@@ -332,7 +352,7 @@ class ExcelExporter:
         parts_df = self._prepare_parts_summary(offers)
 
         # Create Excel file with multiple sheets
-        with pd.ExcelWriter(self.output_file, engine="xlsxwriter") as writer:
+        with pd.ExcelWriter(output_file, engine="xlsxwriter") as writer:
             # Write sheets
             if not offers_df.empty:
                 offers_df.to_excel(writer, sheet_name="offers_raw", index=False)
@@ -483,7 +503,7 @@ class ExcelExporter:
                 elif sheet_name == "part_summary" and not parts_df.empty:
                     worksheet.autofilter(0, 0, len(parts_df), len(parts_df.columns) - 1)
 
-        print(f"Excel file created successfully: {self.output_file}")
+        print(f"Excel file created successfully: {output_file}")
 
         # Print summary statistics
         print(f"\nExport Summary:")
@@ -491,7 +511,133 @@ class ExcelExporter:
         print(f"- Unique sellers: {len(sellers_df)} sellers")
         print(f"- Unique parts: {len(parts_df)} parts")
 
-        return self.output_file
+        return output_file
+
+    def _export_streaming(self, offers: List[Dict[str, Any]], output_file: str) -> str:
+        """
+        Export offers with xlsxwriter in constant memory mode.
+
+        Rows are flushed to disk as they are written instead of the whole
+        workbook being held in memory, which keeps very large runs within
+        memory. Each row must be complete before the next one starts, so
+        only column formats, headers, hyperlinks, frozen headers and filters
+        are applied; there is no auto-fit or outlier highlighting.
+
+        Args:
+            offers: List of offer dictionaries
+            output_file: Excel file path to write
+
+        Returns:
+            Path to the created Excel file
+        """
+        # Sort by relevance and price, like the DataFrame export
+        offer_rows = sorted(
+            (self._offer_row(offer) for offer in offers),
+            key=lambda row: (-(row["relevance"] or 0), row["price_toman"] or 0),
+        )
+        sellers_df = self._prepare_sellers_summary(offers)
+        parts_df = self._prepare_parts_summary(offers)
+
+        workbook = xlsxwriter.Workbook(output_file, {"constant_memory": True})
+        try:
+            header_format = workbook.add_format(
+                {
+                    "bold": True,
+                    "font_color": "white",
+                    "bg_color": "#366092",
+                    "border": 1,
+                    "align": "center",
+                }
+            )
+            currency_format = workbook.add_format({"num_format": "#,##0", "border": 1})
+            url_format = workbook.add_format(
+                {"font_color": "blue", "underline": 1, "border": 1}
+            )
+            relevance_format = workbook.add_format({"num_format": "0.00", "border": 1})
+
+            column_formats = {
+                "price_toman": (12, currency_format),
+                "price_rial": (12, currency_format),
+                "product_url": (50, url_format),
+                "seller_url": (50, url_format),
+                "validation_urls": (60, url_format),
+                "sample_urls": (60, url_format),
+                "relevance": (10, relevance_format),
+                "AMP_toman": (15, currency_format),
+                "median_price_toman": (15, currency_format),
+                "min_price_toman": (15, currency_format),
+                "max_price_toman": (15, currency_format),
+            }
+
+            sheets = []
+            if offer_rows:
+                columns = list(offer_rows[0])
+                sheets.append(
+                    (
+                        "offers_raw",
+                        columns,
+                        ([row[col] for col in columns] for row in offer_rows),
+                        len(offer_rows),
+                    )
+                )
+            for sheet_name, df in (
+                ("sellers_summary", sellers_df),
+                ("part_summary", parts_df),
+            ):
+                if not df.empty:
+                    sheets.append(
+                        (
+                            sheet_name,
+                            list(df.columns),
+                            df.itertuples(index=False, name=None),
+                            len(df),
+                        )
+                    )
+
+            for sheet_name, columns, rows, row_count in sheets:
+                worksheet = workbook.add_worksheet(sheet_name)
+
+                # Column formats must be set before any row is written
+                url_columns = []
+                for col_idx, col in enumerate(columns):
+                    if col in column_formats:
+                        width, cell_format = column_formats[col]
+                        worksheet.set_column(col_idx, col_idx, width, cell_format)
+                    if col in ("product_url", "seller_url"):
+                        url_columns.append(col_idx)
+
+                worksheet.write_row(0, 0, columns, header_format)
+
+                for row_idx, values in enumerate(rows, start=1):
+                    worksheet.write_row(row_idx, 0, values)
+
+                    # Add hyperlinks for URLs
+                    for col_idx in url_columns:
+                        url_value = values[col_idx]
+                        if url_value and str(url_value).startswith("http"):
+                            worksheet.write_url(
+                                row_idx,
+                                col_idx,
+                                url_value,
+                                url_format,
+                                string=str(url_value),
+                            )
+
+                # Freeze header row and enable filters
+                worksheet.freeze_panes(1, 0)
+                worksheet.autofilter(0, 0, row_count, len(columns) - 1)
+        finally:
+            workbook.close()
+
+        print(f"Excel file created successfully: {output_file}")
+
+        # Print summary statistics
+        print(f"\nExport Summary:")
+        print(f"- Raw offers: {len(offer_rows)} rows")
+        print(f"- Unique sellers: {len(sellers_df)} sellers")
+        print(f"- Unique parts: {len(parts_df)} parts")
+
+        return output_file
 
 
 def test_exporter():
@@ -4,11 +4,110 @@ Handles negative filtering and relevance scoring for search results.
 """
 
 import re
-from typing import Any, Dict, List, Tuple
+from operator import itemgetter
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+import ahocorasick
 
 from core.config_manager import get_config
 from utils.text import clean_whitespace, normalize_digits
 
+# Regex syntax other than escaped punctuation (as in r"e\+") marks a real regex
+_REGEX_SYNTAX = re.compile(r"\\\w|(?<!\\)[.^$*+?{}\[\]|()]")
+_ESCAPED_CHAR = re.compile(r"\\(.)")
+
+# Attribute families extracted from titles. Internally a title's attributes
+# are a list of small int codes in this order, where code 0 means UNKNOWN.
+_ATTRIBUTE_FAMILIES = ("car_model", "part_type", "side", "trim", "tech")
+_CAR_MODEL, _PART_TYPE, _SIDE, _TRIM, _TECH = range(len(_ATTRIBUTE_FAMILIES))
+
+# Attributes that make up part_key, in order
+_PART_KEY_ORDER = ("part_type", "side", "tech", "trim")
+
+# Attributes that make up part_name_norm, in order, with their casing
+_PART_NAME_ORDER = (
+    ("car_model", str.title),
+    ("part_type", str.title),
+    ("side", str.upper),
+    ("trim", str.title),
+    ("tech", str.upper),
+)
+
+
+def _pattern_literal(pattern: str) -> Optional[str]:
+    """
+    Return the literal text a pattern matches, or None for a real regex.
+
+    Args:
+        pattern: Regex pattern string
+
+    Returns:
+        Unescaped literal string, or None if the pattern needs the regex engine
+    """
+    if _REGEX_SYNTAX.search(pattern):
+        return None
+    return _ESCAPED_CHAR.sub(r"\1", pattern)
+
+
+class _PatternMatcher:
+    """
+    Multi-pattern matcher for normalized text.
+
+    Literal patterns are loaded into an Aho-Corasick automaton so a title is
+    scanned once regardless of how many patterns there are. The automaton
+    scan is linear in the text length and never backtracks. Patterns that use
+    real regex syntax are kept as separate compiled regexes, never fused into
+    one alternation, and checked after it.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Any]]):
+        """
+        Build the matcher.
+
+        Args:
+            entries: (pattern, payload) pairs; payloads are reported on match
+        """
+        automaton = ahocorasick.Automaton()
+        # Bound ``search`` methods, so the hot loops skip the attribute lookup
+        self._regex_searches = []
+
+        for pattern, payload in entries:
+            literal = _pattern_literal(pattern)
+            if literal is None:
+                self._regex_searches.append((re.compile(pattern).search, payload))
+            elif literal in automaton:
+                automaton.get(literal).append(payload)
+            else:
+                automaton.add_word(literal, [payload])
+
+        if len(automaton):
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            self._automaton = None
+
+    def iter_payloads(self, text: str) -> Iterator[Any]:
+        """Yield the payload of every pattern occurrence in text."""
+        if self._automaton is not None:
+            for _, payloads in self._automaton.iter(text):
+                yield from payloads
+
+        for search, payload in self._regex_searches:
+            if search(text):
+                yield payload
+
+    def search(self, text: str) -> Optional[Any]:
+        """Return the payload of the first match in text, or None."""
+        if self._automaton is not None:
+            for _, payloads in self._automaton.iter(text):
+                return payloads[0]
+
+        for search, payload in self._regex_searches:
+            if search(text):
+                return payload
+
+        return None
+
 
 class RelevanceFilter:
     """
@@ -87,14 +186,11 @@ class RelevanceFilter:
                 r"بامپر جلو",
                 r"front bumper",
                 r"bumper front",
-                r"سپر جلو",
-                r"بامپر جلو",
             ],
             "headlamp": [
                 r"چراغ جلو",
                 r"headlight",
                 r"headlamp",
-                r"چراغ جلو",
                 r"چراغ اصلی",
                 r"main light",
             ],
@@ -103,17 +199,15 @@ class RelevanceFilter:
                 r"fender front",
                 r"front fender",
                 r"wing front",
-                r"گلگیر جلو",
                 r"فندر جلو",
             ],
-            "hood": [r"کاپوت", r"hood", r"bonnet", r"کاپوت", r"سقف موتور"],
+            "hood": [r"کاپوت", r"hood", r"bonnet", r"سقف موتور"],
             "grille": [
                 r"جلوپنجره",
                 r"grille",
                 r"گریل",
                 r"جلو پنجره",
                 r"radiator grille",
-                r"جلوپنجره",
                 r"شبکه جلو",
             ],
         }
@@ -146,158 +240,144 @@ class RelevanceFilter:
         self.tech_patterns = {
             "led": [r"led", r"ال ای دی", r"ال‌ای‌دی"],
             "halogen": [r"halogen", r"هالوژن"],
-            "matrix": [r"matrix", r"مکس", r"matrix"],
+            "matrix": [r"matrix", r"مکس"],
             "xenon": [r"xenon", r"زنون", r"کسنون"],
         }
 
+        # Drop duplicate patterns (order preserved) so none is matched twice
+        for pattern_dict in (
+            self.negative_patterns,
+            self.positive_patterns,
+            self.car_models,
+            self.trim_patterns,
+            self.side_patterns,
+            self.tech_patterns,
+        ):
+            for category, patterns in pattern_dict.items():
+                pattern_dict[category] = list(dict.fromkeys(patterns))
+
+        # Matching runs on _normalize_text output, which is already lowercased
+        self._negative_matcher = _PatternMatcher(
+            (pattern, category)
+            for category, patterns in self.negative_patterns.items()
+            for pattern in patterns
+        )
+
+        # Pattern dicts per attribute family, in _ATTRIBUTE_FAMILIES order
+        attribute_values = (
+            self.car_models,
+            self.positive_patterns,
+            self.side_patterns,
+            self.trim_patterns,
+            self.tech_patterns,
+        )
+        # Value names per family, indexed by attribute code
+        self._attribute_names = tuple(
+            ("UNKNOWN",) + tuple(value.upper() for value in values)
+            for values in attribute_values
+        )
+        # Payloads are (family index, value code). Codes follow dict order, so
+        # when several values of a family match, the one listed last wins.
+        self._attribute_matcher = _PatternMatcher(
+            (pattern, (family, code))
+            for family, values in enumerate(attribute_values)
+            for code, patterns in enumerate(values.values(), start=1)
+            for pattern in patterns
+        )
+
     def _normalize_text(self, text: str) -> str:
         """Normalize text for pattern matching."""
         if not text:
             return ""
         return normalize_digits(clean_whitespace(text.lower()))
 
-    def _check_negative_patterns(self, text: str) -> List[str]:
-        """
-        Check if text matches any negative patterns.
-
-        Args:
-            text: Text to check
+    def _query_words(self, query: str) -> FrozenSet[str]:
+        """Split a search query into its set of normalized words."""
+        return frozenset(self._normalize_text(query).split())
 
-        Returns:
-            List of matched negative categories
+    def _check_negative_patterns(self, normalized_text: str) -> bool:
         """
-        normalized_text = self._normalize_text(text)
-        matched_categories = []
-
-        for category, patterns in self.negative_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, normalized_text, re.IGNORECASE):
-                    matched_categories.append(category)
-                    break
-
-        return matched_categories
-
-    def _check_positive_patterns(self, text: str) -> List[str]:
-        """
-        Check if text matches any positive patterns.
+        Check if text matches any negative patterns.
 
         Args:
-            text: Text to check
+            normalized_text: Text already passed through _normalize_text
 
         Returns:
-            List of matched positive categories
+            True if any negative pattern matched
         """
-        normalized_text = self._normalize_text(text)
-        matched_categories = []
-
-        for category, patterns in self.positive_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, normalized_text, re.IGNORECASE):
-                    matched_categories.append(category)
-                    break
-
-        return matched_categories
+        return self._negative_matcher.search(normalized_text) is not None
 
-    def _extract_part_attributes(self, text: str) -> Dict[str, str]:
+    def _extract_attribute_codes(self, normalized_text: str) -> List[int]:
         """
-        Extract part attributes from text.
+        Extract part attributes from text as int codes.
 
         Args:
-            text: Text to analyze
+            normalized_text: Text already passed through _normalize_text
 
         Returns:
-            Dictionary with extracted attributes
+            List of attribute codes in _ATTRIBUTE_FAMILIES order (0 = unknown)
         """
-        normalized_text = self._normalize_text(text)
-        attributes = {
-            "car_model": "UNKNOWN",
-            "part_type": "UNKNOWN",
-            "side": "UNKNOWN",
-            "trim": "UNKNOWN",
-            "tech": "UNKNOWN",
+        codes = [0] * len(_ATTRIBUTE_FAMILIES)
+        for family, code in self._attribute_matcher.iter_payloads(normalized_text):
+            if code > codes[family]:
+                codes[family] = code
+        return codes
+
+    def _attributes_from_codes(self, codes: List[int]) -> Dict[str, str]:
+        """Convert attribute codes to the attribute-name dictionary."""
+        return {
+            family: names[code]
+            for family, names, code in zip(
+                _ATTRIBUTE_FAMILIES, self._attribute_names, codes
+            )
         }
 
-        # Extract car model
-        for model, patterns in self.car_models.items():
-            for pattern in patterns:
-                if re.search(pattern, normalized_text, re.IGNORECASE):
-                    attributes["car_model"] = model.upper()
-                    break
-
-        # Extract part type from positive patterns
-        for part_type, patterns in self.positive_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, normalized_text, re.IGNORECASE):
-                    attributes["part_type"] = part_type.upper()
-                    break
-
-        # Extract side
-        for side, patterns in self.side_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, normalized_text, re.IGNORECASE):
-                    attributes["side"] = side.upper()
-                    break
-
-        # Extract trim
-        for trim, patterns in self.trim_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, normalized_text, re.IGNORECASE):
-                    attributes["trim"] = trim.upper()
-                    break
-
-        # Extract technology
-        for tech, patterns in self.tech_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, normalized_text, re.IGNORECASE):
-                    attributes["tech"] = tech.upper()
-                    break
-
-        return attributes
-
     def _calculate_relevance_score(
-        self, title: str, query: str, attributes: Dict[str, str]
+        self,
+        normalized_title: str,
+        query_words: FrozenSet[str],
+        codes: List[int],
     ) -> float:
         """
         Calculate relevance score for a search result.
 
+        Scoring is five int-flag checks plus one set intersection, run once
+        per distinct title in a batch; there is no numeric loop worth handing
+        to a JIT or vectorizing.
+
         Args:
-            title: Product title
-            query: Search query
-            attributes: Extracted attributes
+            normalized_title: Normalized product title
+            query_words: Words of the normalized search query
+            codes: Extracted attribute codes
 
         Returns:
             Relevance score between 0 and 1
         """
         score = 0.0
-        normalized_title = self._normalize_text(title)
-        normalized_query = self._normalize_text(query)
 
         # Base score for having a part type
-        if attributes["part_type"] != "UNKNOWN":
+        if codes[_PART_TYPE]:
             score += 0.3
 
         # Score for car model match
-        if attributes["car_model"] != "UNKNOWN":
+        if codes[_CAR_MODEL]:
             score += 0.2
 
         # Score for side specification
-        if attributes["side"] != "UNKNOWN":
+        if codes[_SIDE]:
             score += 0.1
 
         # Score for trim specification
-        if attributes["trim"] != "UNKNOWN":
+        if codes[_TRIM]:
             score += 0.1
 
         # Score for technology specification
-        if attributes["tech"] != "UNKNOWN":
+        if codes[_TECH]:
             score += 0.1
 
         # Word overlap score
-        title_words = set(normalized_title.split())
-        query_words = set(normalized_query.split())
-
         if query_words:
-            overlap = len(title_words.intersection(query_words))
+            overlap = len(query_words.intersection(normalized_title.split()))
             word_score = overlap / len(query_words)
             score += word_score * 0.2
 
@@ -317,27 +397,45 @@ class RelevanceFilter:
         Returns:
             Tuple of (is_valid, relevance_score, attributes)
         """
-        # Check for negative patterns first
-        negative_matches = self._check_negative_patterns(title)
-        if negative_matches:
-            return False, 0.0, {}
+        return self._filter_and_score_normalized(
+            self._normalize_text(title), self._query_words(query)
+        )
+
+    def _filter_and_score_normalized(
+        self, normalized_title: str, query_words: FrozenSet[str]
+    ) -> Tuple[bool, float, Dict[str, str]]:
+        """
+        Filter and score a search result whose title and query are normalized.
 
-        # Check for positive patterns
-        positive_matches = self._check_positive_patterns(title)
-        if not positive_matches:
+        Args:
+            normalized_title: Normalized product title
+            query_words: Words of the normalized search query
+
+        Returns:
+            Tuple of (is_valid, relevance_score, attributes)
+        """
+        # Check for negative patterns first
+        if self._check_negative_patterns(normalized_title):
             return False, 0.0, {}
 
         # Extract attributes
-        attributes = self._extract_part_attributes(title)
+        codes = self._extract_attribute_codes(normalized_title)
+
+        # The part_type family uses the positive patterns, so a part type code
+        # means a positive pattern matched; no separate positive scan needed
+        if not codes[_PART_TYPE]:
+            return False, 0.0, {}
 
         # Calculate relevance score
-        relevance_score = self._calculate_relevance_score(title, query, attributes)
+        relevance_score = self._calculate_relevance_score(
+            normalized_title, query_words, codes
+        )
 
         # Only accept if relevance score is above threshold
         min_relevance = 0.3
         is_valid = relevance_score >= min_relevance
 
-        return is_valid, relevance_score, attributes
+        return is_valid, relevance_score, self._attributes_from_codes(codes)
 
     def generate_part_key(self, attributes: Dict[str, str]) -> str:
         """
@@ -349,12 +447,9 @@ class RelevanceFilter:
         Returns:
             Part key in format: BODY:<PART_TYPE>:<SIDE>:<TECH>:<TRIM>
         """
-        part_type = attributes.get("part_type", "UNKNOWN")
-        side = attributes.get("side", "UNKNOWN")
-        tech = attributes.get("tech", "UNKNOWN")
-        trim = attributes.get("trim", "UNKNOWN")
-
-        return f"BODY:{part_type}:{side}:{tech}:{trim}"
+        return "BODY:" + ":".join(
+            [attributes.get(name, "UNKNOWN") for name in _PART_KEY_ORDER]
+        )
 
     def filter_search_results(
         self, results: List[Dict[str, Any]], query: str
@@ -371,40 +466,56 @@ class RelevanceFilter:
         """
         filtered_results = []
 
+        # The query is the same for every result, so tokenize it only once
+        query_words = self._query_words(query)
+
+        # Search pages list the same product title for many sellers; score
+        # each distinct title once per batch, and give every result with that
+        # title the same annotation values (None for rejected titles). The
+        # attributes dict is shared between those results and is read-only.
+        annotations: Dict[str, Optional[Dict[str, Any]]] = {}
+
         for result in results:
             title = result.get("title_raw", "")
 
-            is_valid, relevance_score, attributes = self.filter_and_score_result(
-                title, query
-            )
-
-            if is_valid:
-                # Add relevance and attributes to result
-                result["relevance"] = relevance_score
-                result["attributes"] = attributes
-                result["part_key"] = self.generate_part_key(attributes)
-
-                # Generate normalized part name
-                part_name_parts = []
-                if attributes["car_model"] != "UNKNOWN":
-                    part_name_parts.append(attributes["car_model"].title())
-                if attributes["part_type"] != "UNKNOWN":
-                    part_name_parts.append(attributes["part_type"].title())
-                if attributes["side"] != "UNKNOWN":
-                    part_name_parts.append(attributes["side"].upper())
-                if attributes["trim"] != "UNKNOWN":
-                    part_name_parts.append(attributes["trim"].title())
-                if attributes["tech"] != "UNKNOWN":
-                    part_name_parts.append(attributes["tech"].upper())
-
-                result["part_name_norm"] = (
-                    " ".join(part_name_parts) if part_name_parts else title
+            if title in annotations:
+                annotation = annotations[title]
+            else:
+                is_valid, relevance_score, attributes = (
+                    self._filter_and_score_normalized(
+                        self._normalize_text(title), query_words
+                    )
                 )
-
+                annotation = None
+                if is_valid:
+                    # Generate normalized part name
+                    part_name_parts = [
+                        case(attributes[name])
+                        for name, case in _PART_NAME_ORDER
+                        if attributes[name] != "UNKNOWN"
+                    ]
+                    annotation = {
+                        "relevance": relevance_score,
+                        "attributes": attributes,
+                        # Extracted attributes always carry every key, so skip
+                        # the defaulting lookups of generate_part_key
+                        "part_key": (
+                            f"BODY:{attributes['part_type']}:{attributes['side']}:"
+                            f"{attributes['tech']}:{attributes['trim']}"
+                        ),
+                        "part_name_norm": (
+                            " ".join(part_name_parts) if part_name_parts else title
+                        ),
+                    }
+                annotations[title] = annotation
+
+            if annotation is not None:
+                # Add relevance and attributes to result
+                result.update(annotation)
                 filtered_results.append(result)
 
         # Sort by relevance score (highest first)
-        filtered_results.sort(key=lambda x: x["relevance"], reverse=True)
+        filtered_results.sort(key=itemgetter("relevance"), reverse=True)
 
         return filtered_results
 
@@ -5,14 +5,13 @@ Handles concurrent processing of multiple parts for improved performance.
 """
 
 import asyncio
-import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from core.config_manager import get_config
 
+_NS_PER_SECOND = 1_000_000_000
+
 
 class ParallelProcessor:
     """Handles parallel processing of multiple parts."""
@@ -26,51 +25,54 @@ class ParallelProcessor:
         # Parallel processing settings
         self.enabled = self.parallel_config.get("enabled", True)
         self.max_workers = self.parallel_config.get("max_workers", 3)
-        self.batch_size = self.parallel_config.get("batch_size", 5)
 
         # Progress tracking
         self.progress_config = self.performance_config.get("progress", {})
         self.show_progress = self.progress_config.get("enabled", True)
         self.update_interval = self.progress_config.get("update_interval", 1)
         self.show_eta = self.progress_config.get("show_eta", True)
+        self._last_print = 0.0
 
         # Statistics
         self.stats = {
             "total_tasks": 0,
             "completed_tasks": 0,
             "failed_tasks": 0,
-            "start_time": None,
-            "end_time": None,
+            "start_ns": None,
+            "end_ns": None,
         }
 
-        # Thread lock for stats updates
-        self._lock = threading.Lock()
-
     def _update_stats(self, completed: int = 0, failed: int = 0) -> None:
-        """Update statistics in a thread-safe manner."""
-        with self._lock:
-            self.stats["completed_tasks"] += completed
-            self.stats["failed_tasks"] += failed
-
-    def _calculate_eta(self) -> Optional[float]:
-        """Calculate estimated time remaining."""
-        if not self.stats["start_time"] or self.stats["completed_tasks"] == 0:
+        """
+        Update statistics.
+
+        All tasks run on a single event loop, so no lock is needed.
+        """
+        self.stats["completed_tasks"] += completed
+        self.stats["failed_tasks"] += failed
+
+    def _calculate_eta(self) -> Optional[int]:
+        """Calculate estimated time remaining in nanoseconds."""
+        completed = self.stats["completed_tasks"]
+        if self.stats["start_ns"] is None or completed == 0:
             return None
 
-        elapsed = time.time() - self.stats["start_time"]
-        rate = self.stats["completed_tasks"] / elapsed
-        remaining = self.stats["total_tasks"] - self.stats["completed_tasks"]
+        elapsed_ns = time.perf_counter_ns() - self.stats["start_ns"]
+        remaining = self.stats["total_tasks"] - completed
 
-        return remaining / rate if rate > 0 else None
+        return remaining * elapsed_ns // completed
 
-    def _format_time(self, seconds: float) -> str:
-        """Format time in a human-readable format."""
-        if seconds < 60:
-            return f"{seconds:.1f}s"
-        elif seconds < 3600:
-            return f"{seconds/60:.1f}m"
+    def _format_time(self, nanoseconds: int) -> str:
+        """Format a nanosecond duration in a human-readable format."""
+        if nanoseconds < 60 * _NS_PER_SECOND:
+            unit_ns, suffix = _NS_PER_SECOND, "s"
+        elif nanoseconds < 3600 * _NS_PER_SECOND:
+            unit_ns, suffix = 60 * _NS_PER_SECOND, "m"
         else:
-            return f"{seconds/3600:.1f}h"
+            unit_ns, suffix = 3600 * _NS_PER_SECOND, "h"
+
+        tenths = nanoseconds * 10 // unit_ns
+        return f"{tenths // 10}.{tenths % 10}{suffix}"
 
     def _print_progress(self) -> None:
         """Print progress information."""
@@ -84,10 +86,15 @@ class ParallelProcessor:
         if total == 0:
             return
 
+        # Throttle redraws to update_interval, but always show the final state
+        now = time.monotonic()
+        if completed + failed < total and now - self._last_print < self.update_interval:
+            return
+        self._last_print = now
+
         percentage = (completed / total) * 100
-        elapsed = (
-            time.time() - self.stats["start_time"] if self.stats["start_time"] else 0
-        )
+        start_ns = self.stats["start_ns"]
+        elapsed_ns = time.perf_counter_ns() - start_ns if start_ns is not None else 0
 
         # Calculate ETA
         eta_str = ""
@@ -98,7 +105,7 @@ class ParallelProcessor:
 
         print(
             f"\r🔄 Progress: {completed}/{total} ({percentage:.1f}%) | "
-            f"Failed: {failed} | Elapsed: {self._format_time(elapsed)}{eta_str}",
+            f"Failed: {failed} | Elapsed: {self._format_time(elapsed_ns)}{eta_str}",
             end="",
             flush=True,
         )
@@ -126,78 +133,87 @@ class ParallelProcessor:
                 results.append(result)
             return results
 
-        # Initialize statistics
-        self.stats = {
-            "total_tasks": len(parts_data),
-            "completed_tasks": 0,
-            "failed_tasks": 0,
-            "start_time": time.time(),
-            "end_time": None,
-        }
-
-        print(f"🚀 Starting parallel processing of {len(parts_data)} parts")
-        print(f"   Workers: {self.max_workers}, Batch size: {self.batch_size}")
-
-        # Process in batches
-        all_results = []
-        for i in range(0, len(parts_data), self.batch_size):
-            batch = parts_data[i : i + self.batch_size]
-            batch_results = await self._process_batch(batch, process_func)
-            all_results.extend(batch_results)
+        all_results: List[Any] = [None] * len(parts_data)
+        async for index, result in self.iter_parts_parallel(parts_data, process_func):
+            all_results[index] = result
 
         # Final statistics
-        self.stats["end_time"] = time.time()
-        total_time = self.stats["end_time"] - self.stats["start_time"]
+        total_ns = self.stats["end_ns"] - self.stats["start_ns"]
 
         print(f"\n✅ Parallel processing completed!")
-        print(f"   Total time: {self._format_time(total_time)}")
+        print(f"   Total time: {self._format_time(total_ns)}")
         print(
             f"   Completed: {self.stats['completed_tasks']}/{self.stats['total_tasks']}"
         )
         print(f"   Failed: {self.stats['failed_tasks']}")
 
         if self.stats["completed_tasks"] > 0:
-            avg_time = total_time / self.stats["completed_tasks"]
-            print(f"   Average time per part: {self._format_time(avg_time)}")
+            avg_ns = total_ns // self.stats["completed_tasks"]
+            print(f"   Average time per part: {self._format_time(avg_ns)}")
 
         return all_results
 
-    async def _process_batch(
-        self, batch: List[Dict[str, Any]], process_func: Callable[[Dict[str, Any]], Any]
-    ) -> List[Any]:
+    async def iter_parts_parallel(
+        self,
+        parts_data: List[Dict[str, Any]],
+        process_func: Callable[[Dict[str, Any]], Any],
+    ) -> AsyncIterator[Tuple[int, Any]]:
         """
-        Process a batch of parts concurrently.
+        Process multiple parts in parallel, yielding results as they finish.
 
         Args:
-            batch: List of part data dictionaries
+            parts_data: List of part data dictionaries
             process_func: Function to process each part
 
-        Returns:
-            List of results from processing the batch
+        Yields:
+            Tuples of (index into parts_data, result); failed parts yield None
         """
-        # Create tasks for the batch
-        tasks = []
-        for part_data in batch:
-            task = asyncio.create_task(
-                self._process_single_part(part_data, process_func)
-            )
-            tasks.append(task)
-
-        # Wait for all tasks in the batch to complete
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Initialize statistics
+        self.stats = {
+            "total_tasks": len(parts_data),
+            "completed_tasks": 0,
+            "failed_tasks": 0,
+            "start_ns": time.perf_counter_ns(),
+            "end_ns": None,
+        }
 
-        # Process results and update statistics
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                print(f"\n❌ Error processing part {i+1}: {result}")
-                self._update_stats(failed=1)
-                processed_results.append(None)
-            else:
-                self._update_stats(completed=1)
-                processed_results.append(result)
+        print(f"🚀 Starting parallel processing of {len(parts_data)} parts")
+        print(f"   Workers: {self.max_workers}")
+
+        # A semaphore over the whole job lets a finished task free its slot
+        # immediately instead of waiting for the slowest task of a batch
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def bounded(
+            index: int, part_data: Dict[str, Any]
+        ) -> Tuple[int, Any, Optional[Exception]]:
+            async with semaphore:
+                try:
+                    result = await self._process_single_part(part_data, process_func)
+                except Exception as e:
+                    return index, None, e
+                return index, result, None
+
+        tasks = [
+            asyncio.create_task(bounded(index, part_data))
+            for index, part_data in enumerate(parts_data)
+        ]
 
-        return processed_results
+        try:
+            for future in asyncio.as_completed(tasks):
+                index, result, error = await future
+                if error is not None:
+                    print(f"\n❌ Error processing part {index+1}: {error}")
+                    self._update_stats(failed=1)
+                else:
+                    self._update_stats(completed=1)
+                self._print_progress()
+                yield index, result
+        finally:
+            # Don't leave work running if the consumer stops early
+            for task in tasks:
+                task.cancel()
+            self.stats["end_ns"] = time.perf_counter_ns()
 
     async def _process_single_part(
         self, part_data: Dict[str, Any], process_func: Callable[[Dict[str, Any]], Any]
@@ -224,10 +240,9 @@ class ParallelProcessor:
         """Get processing statistics."""
         stats = self.stats.copy()
 
-        if stats["start_time"] and stats["end_time"]:
-            stats["total_time"] = stats["end_time"] - stats["start_time"]
-        elif stats["start_time"]:
-            stats["total_time"] = time.time() - stats["start_time"]
+        if stats["start_ns"] is not None:
+            end_ns = stats["end_ns"] or time.perf_counter_ns()
+            stats["total_time"] = (end_ns - stats["start_ns"]) / _NS_PER_SECOND
         else:
             stats["total_time"] = 0
 
@@ -244,8 +259,8 @@ class ParallelProcessor:
             "total_tasks": 0,
             "completed_tasks": 0,
             "failed_tasks": 0,
-            "start_time": None,
-            "end_time": None,
+            "start_ns": None,
+            "end_ns": None,
         }
 
 
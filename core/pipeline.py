@@ -5,10 +5,15 @@ Coordinates CSV input, scraping, normalization, deduplication, and Excel export.
 
 import asyncio
 import csv
+import os
+import sys
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from adapters.torob_search import TorobScraper
 from core.dedupe import OfferDeduplicator
@@ -16,6 +21,113 @@ from core.entity_normalizer import PartNormalizer
 from core.exporter import ExcelExporter
 from utils.text import convert_rial_to_toman, detect_currency_unit
 
+# Part metadata copied onto every scraped offer
+_PART_METADATA_FIELDS = (
+    "part_key",
+    "part_name_norm",
+    "car_model",
+    "part_type",
+    "side",
+    "variant",
+    "trim",
+)
+
+# Most recent warnings/errors kept in the pipeline statistics
+_MAX_ERRORS_KEPT = 10_000
+
+# Low-cardinality scraped offer fields worth interning
+_INTERNED_OFFER_FIELDS = ("seller_name", "availability")
+
+
+class _TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Spaces acquisitions out to ``rate`` per second across all callers,
+    allowing short bursts of up to ``burst``.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class _AdaptiveLimiter:
+    """
+    AIMD (additive-increase, multiplicative-decrease) concurrency limiter.
+
+    Allows up to ``limit`` concurrent holders. A release whose latency is well
+    above the running average halves the limit; every ``limit`` normal
+    releases in a row raise it by one, up to ``max_limit``.
+    """
+
+    def __init__(
+        self, max_limit: int, slow_factor: float = 2.0, smoothing: float = 0.2
+    ):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.slow_factor = slow_factor
+        self.smoothing = smoothing
+        self._in_use = 0
+        self._successes = 0
+        self._avg_latency: Optional[float] = None
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait until the current limit allows one more holder."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_use < self.limit)
+            self._in_use += 1
+
+    async def release(self, latency: Optional[float]) -> None:
+        """
+        Release a hold and adapt the limit.
+
+        Args:
+            latency: Seconds the held work took, or None if it never started
+        """
+        async with self._condition:
+            self._in_use -= 1
+
+            if latency is not None:
+                if (
+                    self._avg_latency is not None
+                    and latency > self.slow_factor * self._avg_latency
+                ):
+                    self.limit = max(1, self.limit // 2)
+                    self._successes = 0
+                else:
+                    self._successes += 1
+                    if self._successes >= self.limit:
+                        self.limit = min(self.max_limit, self.limit + 1)
+                        self._successes = 0
+
+                if self._avg_latency is None:
+                    self._avg_latency = latency
+                else:
+                    self._avg_latency += self.smoothing * (latency - self._avg_latency)
+
+            self._condition.notify_all()
+
 
 class ScrapingPipeline:
     """
@@ -28,6 +140,8 @@ class ScrapingPipeline:
         output_file: str = "torob_prices.xlsx",
         headless: bool = True,
         delay_range: tuple = (1.5, 3.0),
+        max_concurrency: int = 3,
+        parts_per_second: float = 0.5,
     ):
         """
         Initialize the scraping pipeline.
@@ -37,17 +151,27 @@ class ScrapingPipeline:
             output_file: Path to Excel output file
             headless: Run browser in headless mode
             delay_range: Random delay range between requests
+            max_concurrency: Maximum number of parts scraped at the same time
+            parts_per_second: Maximum rate at which part scrapes are started
         """
         self.input_file = input_file
         self.output_file = output_file
         self.headless = headless
         self.delay_range = delay_range
+        self.max_concurrency = max(1, max_concurrency)
+        self.parts_per_second = parts_per_second
 
         # Initialize components
         self.normalizer = PartNormalizer()
         self.deduplicator = OfferDeduplicator()
         self.exporter = ExcelExporter(output_file)
 
+        # Normalizer results per (part_name, part_code); repeated part names in
+        # the input are only extracted and validated once
+        self._metadata_cache: Dict[
+            Tuple[str, Optional[str]], Tuple[Dict[str, str], bool, list]
+        ] = {}
+
         # Statistics
         self.stats = {
             "start_time": None,
@@ -56,9 +180,35 @@ class ScrapingPipeline:
             "total_offers_found": 0,
             "offers_after_dedup": 0,
             "unique_sellers": 0,
-            "errors": [],
+            # Bounded, so a pathological run cannot grow it without limit
+            "errors": deque(maxlen=_MAX_ERRORS_KEPT),
         }
 
+    def iter_input_parts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream parts from CSV input file, one row at a time.
+
+        Incomplete rows are skipped with a warning.
+
+        Yields:
+            Part dictionaries
+        """
+        with open(
+            self.input_file, "r", encoding="utf-8", newline="", buffering=1 << 20
+        ) as file:
+            for row in csv.DictReader(file):
+                part = {
+                    "part_id": int(row.get("part_id", 0)),
+                    "part_name": row.get("part_name", "").strip(),
+                    "part_code": row.get("part_code", "").strip(),
+                    "keywords": row.get("keywords", "").strip(),
+                }
+
+                if part["part_id"] and part["part_name"] and part["keywords"]:
+                    yield part
+                else:
+                    print(f"Warning: Skipping incomplete part: {part}")
+
     def load_input_parts(self) -> List[Dict[str, Any]]:
         """
         Load parts from CSV input file.
@@ -66,31 +216,17 @@ class ScrapingPipeline:
         Returns:
             List of part dictionaries
         """
-        if not Path(self.input_file).exists():
-            raise FileNotFoundError(f"Input file not found: {self.input_file}")
-
-        parts = []
-
         try:
-            with open(self.input_file, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-
-                for row in reader:
-                    part = {
-                        "part_id": int(row.get("part_id", 0)),
-                        "part_name": row.get("part_name", "").strip(),
-                        "part_code": row.get("part_code", "").strip(),
-                        "keywords": row.get("keywords", "").strip(),
-                    }
-
-                    if part["part_id"] and part["part_name"] and part["keywords"]:
-                        parts.append(part)
-                    else:
-                        print(f"Warning: Skipping incomplete part: {part}")
+            parts = list(self.iter_input_parts())
 
             print(f"Loaded {len(parts)} parts from {self.input_file}")
             return parts
 
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"Input file not found: {self.input_file}"
+            ) from None
+
         except Exception as e:
             error_msg = f"Error loading input file: {e}"
             print(error_msg)
@@ -108,9 +244,13 @@ class ScrapingPipeline:
             Part dictionary with added metadata
         """
         try:
-            metadata = self.normalizer.extract_metadata(
-                part["part_name"], part.get("part_code")
-            )
+            cache_key = (part["part_name"], part.get("part_code"))
+            cached = self._metadata_cache.get(cache_key)
+            if cached is None:
+                metadata = self.normalizer.extract_metadata(*cache_key)
+                cached = (metadata, *self.normalizer.validate_metadata(metadata))
+                self._metadata_cache[cache_key] = cached
+            metadata, is_valid, issues = cached
 
             part.update(
                 {
@@ -124,11 +264,6 @@ class ScrapingPipeline:
                 }
             )
 
-            # Validate extraction
-            is_valid, issues = self.normalizer.validate_extraction(
-                part["part_name"], part.get("part_code")
-            )
-
             if not is_valid:
                 warning_msg = (
                     f"Part {part['part_id']} normalization issues: {', '.join(issues)}"
@@ -162,19 +297,20 @@ class ScrapingPipeline:
                 part["part_id"], part["part_name"], part["part_code"], part["keywords"]
             )
 
-            # Add part metadata to each offer
+            # Add part metadata to each offer; the values are the same for
+            # every offer, so build the mapping once
+            part_metadata = {
+                field: part.get(field, "") for field in _PART_METADATA_FIELDS
+            }
             for offer in offers:
-                offer.update(
-                    {
-                        "part_key": part.get("part_key", ""),
-                        "part_name_norm": part.get("part_name_norm", ""),
-                        "car_model": part.get("car_model", ""),
-                        "part_type": part.get("part_type", ""),
-                        "side": part.get("side", ""),
-                        "variant": part.get("variant", ""),
-                        "trim": part.get("trim", ""),
-                    }
-                )
+                offer.update(part_metadata)
+
+                # Seller and availability strings repeat across many offers;
+                # keep one shared object per distinct value
+                for field in _INTERNED_OFFER_FIELDS:
+                    value = offer.get(field)
+                    if type(value) is str:
+                        offer[field] = sys.intern(value)
 
             return offers
 
@@ -201,18 +337,16 @@ class ScrapingPipeline:
         for offer in offers:
             try:
                 price_raw = offer.get("price_raw", 0) or 0
-                currency_unit = offer.get("currency_unit", "unknown")
-
-                # Convert Rial to Toman if needed
-                if currency_unit == "rial" and price_raw > 0:
-                    price_toman = convert_rial_to_toman(price_raw)
-                    offer["price_raw"] = price_toman
-                    offer["currency_unit"] = "toman"
 
                 # Skip offers without valid prices
                 if price_raw <= 0:
                     continue
 
+                # Convert Rial to Toman if needed
+                if offer.get("currency_unit", "unknown") == "rial":
+                    offer["price_raw"] = convert_rial_to_toman(price_raw)
+                    offer["currency_unit"] = "toman"
+
                 normalized_offers.append(offer)
 
             except Exception as e:
@@ -222,6 +356,52 @@ class ScrapingPipeline:
 
         return normalized_offers
 
+    async def deduplicate_offers_parallel(
+        self, offers: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Set[str]]:
+        """
+        Deduplicate offers using one worker process per part.
+
+        Offers of different parts are never duplicates of each other, so each
+        part's offers are deduplicated independently and the results are
+        concatenated in order.
+
+        Args:
+            offers: List of normalized offer dictionaries
+
+        Returns:
+            Tuple of (deduplicated offers, their normalized seller names)
+        """
+        part_groups: Dict[Any, List[Dict[str, Any]]] = {}
+        for offer in offers:
+            part_groups.setdefault(offer.get("part_id"), []).append(offer)
+
+        if len(part_groups) <= 1:
+            results = [self.deduplicator.deduplicate_offers(offers)]
+        else:
+            loop = asyncio.get_running_loop()
+            max_workers = min(len(part_groups), os.cpu_count() or 1)
+
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            pool, self.deduplicator.deduplicate_offers, part_offers
+                        )
+                        for part_offers in part_groups.values()
+                    )
+                )
+
+        # Collect sellers while concatenating instead of in a separate pass
+        deduplicated_offers = []
+        unique_sellers = set()
+        for part_offers in results:
+            for offer in part_offers:
+                deduplicated_offers.append(offer)
+                unique_sellers.add(offer.get("seller_name_norm", ""))
+
+        return deduplicated_offers, unique_sellers
+
     def setup_seller_mappings(self):
         """Setup known seller name mappings for better deduplication."""
         # Add common seller name variations
@@ -261,7 +441,13 @@ class ScrapingPipeline:
             print("🔧 Step 2: Normalizing part metadata...")
             for i, part in enumerate(parts):
                 parts[i] = self.normalize_part_metadata(part)
-                print(f"   ✓ Part {part['part_id']}: {part.get('part_key', 'UNKNOWN')}")
+            # One write for the whole list instead of one per part
+            print(
+                "\n".join(
+                    f"   ✓ Part {part['part_id']}: {part.get('part_key', 'UNKNOWN')}"
+                    for part in parts
+                )
+            )
 
             # Step 3: Setup seller mappings
             print("👥 Step 3: Setting up seller mappings...")
@@ -271,24 +457,59 @@ class ScrapingPipeline:
             print("🕷️  Step 4: Scraping offers from Torob...")
             all_offers = []
 
-            async with TorobScraper(
-                headless=self.headless, delay_range=self.delay_range
-            ) as scraper:
-                for i, part in enumerate(parts):
-                    print(
-                        f"\n🔍 Processing part {i+1}/{len(parts)}: {part['part_name']}"
+            async with AsyncExitStack() as stack:
+                # A scraper drives a single browser page, so each concurrent
+                # part gets its own scraper from this pool. They all open their
+                # pages in the first scraper's browser context to reuse its
+                # connections instead of launching a browser each.
+                scrapers: asyncio.Queue = asyncio.Queue()
+                shared_context = None
+                for _ in range(min(self.max_concurrency, len(parts))):
+                    scraper = await stack.enter_async_context(
+                        TorobScraper(
+                            headless=self.headless,
+                            delay_range=self.delay_range,
+                            shared_context=shared_context,
+                        )
                     )
-
-                    offers = await self.scrape_part_offers(scraper, part)
-                    all_offers.extend(offers)
+                    shared_context = scraper.context
+                    scrapers.put_nowait(scraper)
+
+                # Rate-limit part starts globally instead of sleeping after
+                # each part
+                limiter = _TokenBucket(self.parts_per_second)
+                # Back off from the pool size when Torob starts slowing down
+                concurrency = _AdaptiveLimiter(scrapers.qsize())
+
+                async def scrape(i: int, part: Dict[str, Any]) -> List[Dict[str, Any]]:
+                    await concurrency.acquire()
+                    scraper = await scrapers.get()
+                    started = None
+                    try:
+                        print(
+                            f"\n🔍 Processing part {i+1}/{len(parts)}: {part['part_name']}"
+                        )
+
+                        await limiter.acquire()
+                        started = time.monotonic()
+                        offers = await self.scrape_part_offers(scraper, part)
+                    finally:
+                        scrapers.put_nowait(scraper)
+                        await concurrency.release(
+                            time.monotonic() - started if started is not None else None
+                        )
 
                     self.stats["parts_processed"] += 1
 
                     print(f"   ✓ Found {len(offers)} offers for part {part['part_id']}")
+                    return offers
+
+                part_offers = await asyncio.gather(
+                    *(scrape(i, part) for i, part in enumerate(parts))
+                )
 
-                    # Add delay between parts to be respectful
-                    if i < len(parts) - 1:  # Don't delay after last part
-                        await asyncio.sleep(2)
+            for offers in part_offers:
+                all_offers.extend(offers)
 
             self.stats["total_offers_found"] = len(all_offers)
             print(f"\n📊 Total offers found: {len(all_offers)}")
@@ -302,26 +523,30 @@ class ScrapingPipeline:
             all_offers = self.normalize_offer_prices(all_offers)
             print(f"   ✓ {len(all_offers)} offers with valid prices")
 
+            # Exact repeats are dropped up front so the pairwise dedup below
+            # never sees them
+            all_offers = self.deduplicator.drop_exact_duplicates(all_offers)
+
             # Step 6: Normalize and deduplicate offers
             print("🧹 Step 6: Normalizing and deduplicating offers...")
             normalized_offers = self.deduplicator.normalize_offers(all_offers)
-            deduplicated_offers = self.deduplicator.deduplicate_offers(
-                normalized_offers
+            deduplicated_offers, unique_sellers = (
+                await self.deduplicate_offers_parallel(normalized_offers)
             )
 
             self.stats["offers_after_dedup"] = len(deduplicated_offers)
             print(f"   ✓ {len(deduplicated_offers)} offers after deduplication")
 
-            # Calculate unique sellers
-            unique_sellers = set(
-                offer.get("seller_name_norm", "") for offer in deduplicated_offers
-            )
             self.stats["unique_sellers"] = len(unique_sellers)
             print(f"   ✓ {len(unique_sellers)} unique sellers found")
 
             # Step 7: Export to Excel
             print("📊 Step 7: Exporting to Excel...")
-            output_file = self.exporter.export_to_excel(deduplicated_offers)
+            # Writing the workbook is blocking file I/O; keep it off the loop
+            loop = asyncio.get_running_loop()
+            output_file = await loop.run_in_executor(
+                None, self.exporter.export_to_excel, deduplicated_offers
+            )
             print(f"   ✓ Excel file created: {output_file}")
 
             # Final statistics
@@ -340,7 +565,9 @@ class ScrapingPipeline:
 
             if self.stats["errors"]:
                 print(f"   • Warnings/Errors: {len(self.stats['errors'])}")
-                for error in self.stats["errors"][-5:]:  # Show last 5 errors
+                errors = self.stats["errors"]
+                # Show last 5 errors
+                for error in islice(errors, max(len(errors) - 5, 0), None):
                     print(f"     - {error}")
 
             return True
@@ -4,9 +4,13 @@ Handles search page scraping, product page drill-down, and data processing.
 """
 
 import asyncio
+import contextvars
 import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.async_api import Browser
 
 from adapters.torob_search import TorobScraper
 from core.exporter_excel import ExcelExporter
@@ -14,12 +18,21 @@ from core.filtering import RelevanceFilter
 from core.parallel_processor import get_parallel_processor
 from core.progress_tracker import get_progress_tracker
 from utils.text import (
-    convert_rial_to_toman,
     detect_currency_unit,
     normalize_seller_name,
 )
 
 
+def _part_metadata(part_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Part fields copied onto every offer found for the part."""
+    return {
+        "part_id": part_data["part_id"],
+        "part_name": part_data["part_name"],
+        "part_code": part_data["part_code"],
+        "query": part_data["keywords"],
+    }
+
+
 class TorobTwoStagePipeline:
     """
     Two-stage pipeline for Torob scraping with relevance filtering.
@@ -32,6 +45,10 @@ class TorobTwoStagePipeline:
         max_cards_per_search: int = 200,
         headless: bool = True,
         delay_range: tuple = (1.5, 3.0),
+        concurrency: Optional[int] = None,
+        segment_size: int = 250_000,
+        drill_relevance_threshold: float = 0.3,
+        browser: Optional[Browser] = None,
     ):
         """
         Initialize the two-stage pipeline.
@@ -42,17 +59,38 @@ class TorobTwoStagePipeline:
             max_cards_per_search: Maximum cards to process per search
             headless: Run browser in headless mode
             delay_range: Random delay range between requests
+            concurrency: Maximum number of parts scraped at once (defaults to
+                performance.parallel.max_workers, or 1 when parallel
+                processing is disabled)
+            segment_size: Maximum offers per Excel file; larger runs are
+                split into <name>_part1.xlsx, <name>_part2.xlsx, ... and each
+                file's summary sheets cover only its own offers
+            drill_relevance_threshold: Minimum relevance for a search result
+                to be drilled down into (at most 20 per part are)
+            browser: Already launched browser to scrape in, so repeated runs
+                only open a new context instead of starting Chromium; it is
+                left running (and headless is ignored)
         """
         self.input_data = input_data
         self.output_file = output_file
         self.max_cards_per_search = max_cards_per_search
         self.headless = headless
         self.delay_range = delay_range
+        self.segment_size = max(1, segment_size)
+        self.drill_relevance_threshold = drill_relevance_threshold
+        self.browser = browser
 
         # Initialize components
         self.filter = RelevanceFilter()
         self.exporter = ExcelExporter(output_file)
         self.parallel_processor = get_parallel_processor()
+        if concurrency is None:
+            concurrency = (
+                self.parallel_processor.max_workers
+                if self.parallel_processor.enabled
+                else 1
+            )
+        self.concurrency = max(1, concurrency)
         self.progress_tracker = get_progress_tracker()
 
         # Statistics
@@ -67,7 +105,12 @@ class TorobTwoStagePipeline:
             "unique_sellers": 0,
             "avg_relevance": 0.0,
             "errors": [],
+            "output_files": [],
         }
+        # Monotonic clock readings for durations; start_time/end_time above
+        # are wall-clock times for display
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
 
     async def run_pipeline(self) -> bool:
         """
@@ -77,6 +120,8 @@ class TorobTwoStagePipeline:
             True if successful, False otherwise
         """
         self.stats["start_time"] = datetime.now()
+        self._started = time.monotonic()
+        self._finished = None
 
         try:
             print("🚀 Starting Two-Stage Torob Pipeline")
@@ -88,82 +133,45 @@ class TorobTwoStagePipeline:
 
             all_offers = []
 
-            async with TorobScraper(
-                headless=self.headless, delay_range=self.delay_range
-            ) as scraper:
-                for i, part_data in enumerate(self.input_data):
-                    part_name = part_data["part_name"]
-                    print(
-                        f"\n🔍 Processing part {i+1}/{len(self.input_data)}: {part_name}"
-                    )
-
-                    # Update progress for search stage
-                    self.progress_tracker.update_task(
-                        f"Searching for {part_name}", f"search_{i}"
-                    )
-
-                    # Stage A: Search page scraping
-                    search_offers = await self._stage_a_search(scraper, part_data)
-                    self.stats["search_results"] += len(search_offers)
-                    self.progress_tracker.complete_task(f"search_{i}")
-
-                    if not search_offers:
-                        print(
-                            f"   ⚠️  No search results found for {part_data['part_name']}"
-                        )
-                        continue
-
-                    # Enhance search results with part metadata
-                    enhanced_search_offers = []
-                    for offer in search_offers:
-                        enhanced_offer = offer.copy()
-                        enhanced_offer.update(
-                            {
-                                "part_id": part_data["part_id"],
-                                "part_name": part_data["part_name"],
-                                "part_code": part_data["part_code"],
-                                "query": part_data["keywords"],
-                                "snapshot_ts": datetime.now().isoformat(),
-                            }
-                        )
-                        enhanced_search_offers.append(enhanced_offer)
-
-                    # Filter and score results
-                    filtered_offers = self.filter.filter_search_results(
-                        enhanced_search_offers, part_data["keywords"]
-                    )
-                    print(
-                        f"   ✓ {len(filtered_offers)} relevant results after filtering"
-                    )
-
-                    if not filtered_offers:
-                        print(
-                            f"   ⚠️  No relevant results after filtering for {part_data['part_name']}"
+            async with AsyncExitStack() as stack:
+                # A scraper drives a single browser page, so each concurrent
+                # part gets its own scraper from this pool. They all open their
+                # pages in the first scraper's browser context to reuse its
+                # connections instead of launching a browser each.
+                scrapers: asyncio.Queue = asyncio.Queue()
+                shared_context = None
+                for _ in range(min(self.concurrency, len(self.input_data))):
+                    scraper = await stack.enter_async_context(
+                        TorobScraper(
+                            headless=self.headless,
+                            delay_range=self.delay_range,
+                            shared_context=shared_context,
+                            shared_browser=self.browser,
                         )
-                        continue
-
-                    # Stage B: Product page drill-down
-                    self.progress_tracker.update_task(
-                        f"Drilling down for {part_name}", f"drill_{i}"
-                    )
-                    product_offers = await self._stage_b_drill_down(
-                        scraper, filtered_offers, part_data
-                    )
-                    self.stats["product_pages"] += len(
-                        [o for o in product_offers if o.get("drilled_down", False)]
-                    )
-                    self.progress_tracker.complete_task(f"drill_{i}")
-
-                    all_offers.extend(product_offers)
-                    self.stats["parts_processed"] += 1
-
-                    print(
-                        f"   ✓ {len(product_offers)} offers found for {part_data['part_name']}"
                     )
+                    shared_context = scraper.context
+                    scrapers.put_nowait(scraper)
+
+                results = await asyncio.gather(
+                    *(
+                        self._process_part(i, part_data, scrapers)
+                        for i, part_data in enumerate(self.input_data)
+                    ),
+                    return_exceptions=True,
+                )
 
-                    # Add delay between parts
-                    if i < len(self.input_data) - 1:
-                        await asyncio.sleep(2)
+            for part_data, result in zip(self.input_data, results):
+                if isinstance(result, Exception):
+                    error_msg = f"Error processing {part_data['part_name']}: {result}"
+                    print(f"❌ {error_msg}")
+                    self.stats["errors"].append(error_msg)
+                    continue
+                offers, part_stats = result
+                all_offers.extend(offers)
+                # Parts run concurrently, so each counts into its own stats and
+                # they are merged here once everything has finished
+                for key, value in part_stats.items():
+                    self.stats[key] += value
 
             self.stats["total_offers"] = len(all_offers)
 
@@ -174,7 +182,13 @@ class TorobTwoStagePipeline:
             # Process and clean offers
             print(f"\n🧹 Processing {len(all_offers)} offers...")
             self.progress_tracker.update_task("Processing offers", "process")
-            processed_offers = self._process_offers(all_offers)
+            # Processing and exporting are blocking work; run them off the
+            # event loop, which other pipelines may be scraping on. Copying
+            # the context keeps their printed output with this run.
+            loop = asyncio.get_running_loop()
+            processed_offers = await loop.run_in_executor(
+                None, contextvars.copy_context().run, self._process_offers, all_offers
+            )
             self.progress_tracker.complete_task("process")
 
             # Calculate statistics
@@ -183,11 +197,12 @@ class TorobTwoStagePipeline:
             # Export to Excel
             print(f"📊 Exporting to Excel...")
             self.progress_tracker.update_task("Exporting to Excel", "export")
-            self.exporter.export_to_excel(processed_offers)
+            self.stats["output_files"] = await loop.run_in_executor(
+                None, contextvars.copy_context().run, self._export, processed_offers
+            )
             self.progress_tracker.complete_task("export")
 
-            self.stats["end_time"] = datetime.now()
-            duration = self.stats["end_time"] - self.stats["start_time"]
+            duration = timedelta(seconds=time.monotonic() - self._started)
 
             # Finish progress tracking
             self.progress_tracker.finish("Pipeline completed successfully!")
@@ -204,11 +219,91 @@ class TorobTwoStagePipeline:
             return False
 
         finally:
-            if not self.stats["end_time"]:
-                self.stats["end_time"] = datetime.now()
+            self._finished = time.monotonic()
+            self.stats["end_time"] = datetime.now()
+
+    async def _process_part(
+        self, i: int, part_data: Dict[str, Any], scrapers: asyncio.Queue
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Run both stages for one part on scrapers taken from the pool.
+
+        Args:
+            i: Index of the part in the input data
+            part_data: Part data dictionary
+            scrapers: Pool of idle TorobScraper instances
+
+        Returns:
+            Tuple of (offers found for the part, statistics to add for it)
+        """
+        part_stats = {
+            "search_results": 0,
+            "product_pages": 0,
+            "parts_processed": 0,
+            "errors": [],
+        }
+        part_name = part_data["part_name"]
+        print(f"\n🔍 Processing part {i+1}/{len(self.input_data)}: {part_name}")
+
+        # Update progress for search stage
+        self.progress_tracker.update_task(f"Searching for {part_name}", f"search_{i}")
+
+        # Stage A: Search page scraping
+        scraper = await scrapers.get()
+        try:
+            search_offers = await self._stage_a_search(
+                scraper, part_data, part_stats["errors"]
+            )
+        finally:
+            scrapers.put_nowait(scraper)
+        part_stats["search_results"] += len(search_offers)
+        self.progress_tracker.complete_task(f"search_{i}")
+
+        if not search_offers:
+            print(f"   ⚠️  No search results found for {part_data['part_name']}")
+            return [], part_stats
+
+        # Filter and score the raw results first; scoring only reads the
+        # title, so only the survivors need to be enhanced
+        filtered_offers = self.filter.filter_search_results(
+            search_offers, part_data["keywords"]
+        )
+        print(f"   ✓ {len(filtered_offers)} relevant results after filtering")
+
+        if not filtered_offers:
+            print(
+                f"   ⚠️  No relevant results after filtering for {part_data['part_name']}"
+            )
+            return [], part_stats
+
+        # Enhance the relevant results with part metadata
+        part_meta = _part_metadata(part_data)
+        snapshot_ts = datetime.now().isoformat()
+        filtered_offers = [
+            {**offer, **part_meta, "snapshot_ts": snapshot_ts}
+            for offer in filtered_offers
+        ]
+
+        # Stage B: Product page drill-down
+        self.progress_tracker.update_task(
+            f"Drilling down for {part_name}", f"drill_{i}"
+        )
+        product_offers = await self._stage_b_drill_down(
+            scrapers, filtered_offers, part_meta, part_stats["errors"]
+        )
+        part_stats["product_pages"] += len(
+            [o for o in product_offers if o.get("drilled_down", False)]
+        )
+        self.progress_tracker.complete_task(f"drill_{i}")
+
+        part_stats["parts_processed"] += 1
+
+        print(f"   ✓ {len(product_offers)} offers found for {part_data['part_name']}")
+
+        return product_offers, part_stats
 
     async def _stage_a_search(
-        self, scraper: TorobScraper, part_data: Dict[str, Any]
+        self, scraper: TorobScraper, part_data: Dict[str, Any], errors: List[str]
     ) -> List[Dict[str, Any]]:
         """
         Stage A: Search page scraping.
@@ -216,6 +311,7 @@ class TorobTwoStagePipeline:
         Args:
             scraper: TorobScraper instance
             part_data: Part data dictionary
+            errors: List to record errors in
 
         Returns:
             List of search result offers
@@ -238,72 +334,114 @@ class TorobTwoStagePipeline:
         except Exception as e:
             error_msg = f"Error in Stage A for {part_data['part_name']}: {e}"
             print(f"   ❌ {error_msg}")
-            self.stats["errors"].append(error_msg)
+            errors.append(error_msg)
             return []
 
     async def _stage_b_drill_down(
         self,
-        scraper: TorobScraper,
+        scrapers: asyncio.Queue,
         filtered_offers: List[Dict[str, Any]],
-        part_data: Dict[str, Any],
+        part_meta: Dict[str, Any],
+        errors: List[str],
     ) -> List[Dict[str, Any]]:
         """
         Stage B: Product page drill-down.
 
+        Product pages are fetched concurrently, one per idle scraper in the
+        pool, so the pool size bounds the requests in flight.
+
         Args:
-            scraper: TorobScraper instance
+            scrapers: Pool of idle TorobScraper instances
             filtered_offers: Filtered search results
-            part_data: Part data dictionary
+            part_meta: Part fields copied onto every offer
+            errors: List to record errors in
 
         Returns:
             List of offers with product page data
         """
         print(f"   🔍 Stage B: Drilling down to product pages")
 
+        # Process top relevant offers (limit to avoid too many requests),
+        # skipping low-scoring ones so weak matches don't cost a page load
+        top_offers = [
+            offer
+            for offer in filtered_offers[:20]
+            if offer.get("relevance", 0) >= self.drill_relevance_threshold
+        ]
+        max_drill_down = len(top_offers)
+        snapshot_ts = datetime.now().isoformat()
+
+        # The drill-downs all start together, so announce them in one write
+        # instead of one print per product page
+        drill_lines = [
+            f"     📄 Drilling down {i+1}/{max_drill_down}: {offer.get('title_raw', '')[:50]}..."
+            for i, offer in enumerate(top_offers)
+            if offer.get("product_url")
+        ]
+        if drill_lines:
+            print("\n".join(drill_lines))
+
+        drilled = await asyncio.gather(
+            *(
+                self._drill_one(i, offer, part_meta, snapshot_ts, scrapers, errors)
+                for i, offer in enumerate(top_offers)
+            )
+        )
+
         all_offers = []
+        for offers in drilled:
+            all_offers.extend(offers)
 
-        # Process top relevant offers (limit to avoid too many requests)
-        max_drill_down = min(20, len(filtered_offers))
-        top_offers = filtered_offers[:max_drill_down]
+        return all_offers
 
-        for i, offer in enumerate(top_offers):
-            try:
-                if not offer.get("product_url"):
-                    # Use card data if no product URL
-                    enhanced_offer = offer.copy()
-                    enhanced_offer.update(
-                        {
-                            "part_id": part_data["part_id"],
-                            "part_name": part_data["part_name"],
-                            "part_code": part_data["part_code"],
-                            "query": part_data["keywords"],
-                            "drilled_down": False,
-                            "seller_url": offer.get(
-                                "seller_url", ""
-                            ),  # Preserve seller URL if available
-                        }
-                    )
-                    all_offers.append(enhanced_offer)
-                    continue
+    async def _drill_one(
+        self,
+        i: int,
+        offer: Dict[str, Any],
+        part_meta: Dict[str, Any],
+        snapshot_ts: str,
+        scrapers: asyncio.Queue,
+        errors: List[str],
+    ) -> List[Dict[str, Any]]:
+        """
+        Drill down into the product page of a single search result.
 
-                print(
-                    f"     📄 Drilling down {i+1}/{max_drill_down}: {offer['title_raw'][:50]}..."
-                )
+        Args:
+            i: Index of the offer among the drilled-down offers
+            offer: Filtered search result
+            part_meta: Part fields copied onto every offer
+            snapshot_ts: Timestamp recorded on product page offers
+            scrapers: Pool of idle TorobScraper instances
+            errors: List to record errors in
 
+        Returns:
+            Offers from the product page, or the card itself if it has none
+        """
+        try:
+            if offer.get("product_url"):
                 # Get product page details
-                product_details = await scraper.get_product_details(
-                    offer["product_url"]
-                )
+                scraper = await scrapers.get()
+                try:
+                    product_details = await scraper.get_product_details(
+                        offer["product_url"]
+                    )
+                finally:
+                    scrapers.put_nowait(scraper)
 
                 if product_details and product_details.get("offers"):
+                    # Fields taken from the search card are the same for every
+                    # seller on the product page, so look them up once
+                    title_raw = offer["title_raw"]
+                    product_url = offer["product_url"]
+                    relevance = offer.get("relevance", 0.0)
+                    part_key = offer.get("part_key", "")
+                    part_name_norm = offer.get("part_name_norm", "")
+
                     # Use product page offers
-                    for product_offer in product_details["offers"]:
-                        enhanced_offer = {
-                            "part_id": part_data["part_id"],
-                            "part_name": part_data["part_name"],
-                            "part_code": part_data["part_code"],
-                            "query": part_data["keywords"],
-                            "title_raw": offer["title_raw"],
+                    return [
+                        {
+                            **part_meta,
+                            "title_raw": title_raw,
                             "seller_name_norm": normalize_seller_name(
                                 product_offer.get("seller_name", "")
                             ),
@@ -312,48 +450,64 @@ class TorobTwoStagePipeline:
                             "currency_unit": product_offer.get(
                                 "currency_unit", "unknown"
                             ),
-                            "product_url": offer["product_url"],
+                            "product_url": product_url,
                             "seller_url": product_offer.get("seller_url", ""),
                             "availability": product_offer.get("availability", ""),
-                            "relevance": offer.get("relevance", 0.0),
-                            "part_key": offer.get("part_key", ""),
-                            "part_name_norm": offer.get("part_name_norm", ""),
+                            "relevance": relevance,
+                            "part_key": part_key,
+                            "part_name_norm": part_name_norm,
                             "drilled_down": True,
-                            "snapshot_ts": datetime.now().isoformat(),
+                            "snapshot_ts": snapshot_ts,
                         }
-                        all_offers.append(enhanced_offer)
-                else:
-                    # Use card data if product page failed
-                    enhanced_offer = offer.copy()
-                    enhanced_offer.update(
-                        {
-                            "part_id": part_data["part_id"],
-                            "part_name": part_data["part_name"],
-                            "part_code": part_data["part_code"],
-                            "query": part_data["keywords"],
-                            "drilled_down": False,
-                            "seller_url": offer.get(
-                                "seller_url", ""
-                            ),  # Preserve seller URL if available
-                        }
-                    )
-                    all_offers.append(enhanced_offer)
+                        for product_offer in product_details["offers"]
+                    ]
+
+            # Use card data if there is no product URL or the product page failed
+            return [
+                {
+                    **offer,
+                    **part_meta,
+                    "drilled_down": False,
+                    # Preserve seller URL if available
+                    "seller_url": offer.get("seller_url", ""),
+                }
+            ]
 
-                # Add delay between product page requests
-                await asyncio.sleep(1.0)
+        except Exception as e:
+            error_msg = f"Error drilling down offer {i+1}: {e}"
+            print(f"     ❌ {error_msg}")
+            errors.append(error_msg)
+            return []
 
-            except Exception as e:
-                error_msg = f"Error drilling down offer {i+1}: {e}"
-                print(f"     ❌ {error_msg}")
-                self.stats["errors"].append(error_msg)
-                continue
+    def _export(self, offers: List[Dict[str, Any]]) -> List[str]:
+        """
+        Write the offers to Excel, split into segment_size files if needed.
 
-        return all_offers
+        Args:
+            offers: Processed offers to export
+
+        Returns:
+            Paths of the files written, in order
+        """
+        if len(offers) <= self.segment_size:
+            return [self.exporter.export_to_excel(offers)]
+
+        return [
+            self.exporter.export_to_excel(
+                offers[start : start + self.segment_size],
+                suffix=f"_part{start // self.segment_size + 1}",
+            )
+            for start in range(0, len(offers), self.segment_size)
+        ]
 
     def _process_offers(self, offers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Process and clean offers.
 
+        This stays a plain loop over the dicts: the arithmetic is trivial and
+        the cost is reading and writing dict fields, which array kernels
+        (NumPy, numba) or worker processes only add copying to.
+
         Args:
             offers: List of offer dictionaries
 
@@ -364,21 +518,23 @@ class TorobTwoStagePipeline:
 
         for offer in offers:
             try:
-                # Normalize prices
+                # Normalize prices, testing each condition once per offer
                 price_raw = offer.get("price_raw", 0) or 0
-                currency_unit = offer.get("currency_unit", "unknown")
 
-                # Convert Rial to Toman if needed
-                if currency_unit == "rial" and price_raw > 0:
-                    price_toman = convert_rial_to_toman(price_raw)
-                    offer["price_toman"] = price_toman
+                if price_raw <= 0:
+                    # Mark missing prices
+                    offer["price_toman"] = price_raw
+                    offer["price_rial"] = 0
+                    offer["price_missing"] = 1
+                elif offer.get("currency_unit") == "rial":
+                    # Convert Rial to Toman (convert_rial_to_toman inlined)
+                    offer["price_toman"] = price_raw // 10
                     offer["price_rial"] = price_raw
+                    offer["price_missing"] = 0
                 else:
                     offer["price_toman"] = price_raw
-                    offer["price_rial"] = price_raw * 10 if price_raw > 0 else 0
-
-                # Mark missing prices
-                offer["price_missing"] = 1 if price_raw <= 0 else 0
+                    offer["price_rial"] = price_raw * 10
+                    offer["price_missing"] = 0
 
                 processed_offers.append(offer)
 
@@ -394,19 +550,24 @@ class TorobTwoStagePipeline:
         if not offers:
             return
 
-        # Count unique sellers
-        unique_sellers = set(offer.get("seller_name_norm", "") for offer in offers)
-        self.stats["unique_sellers"] = len(unique_sellers)
-
-        # Calculate average relevance
-        relevance_scores = [
-            offer.get("relevance", 0.0) for offer in offers if offer.get("relevance")
-        ]
-        if relevance_scores:
-            self.stats["avg_relevance"] = sum(relevance_scores) / len(relevance_scores)
+        # Collect sellers, relevance and filtered count in a single pass
+        unique_sellers = set()
+        relevance_sum = 0.0
+        relevance_count = 0
+        filtered_count = 0
+        for offer in offers:
+            unique_sellers.add(offer.get("seller_name_norm", ""))
+            relevance = offer.get("relevance")
+            if relevance:
+                relevance_sum += relevance
+                relevance_count += 1
+                # Filtered offers are those with relevance > 0
+                if relevance > 0:
+                    filtered_count += 1
 
-        # Count filtered offers (those with relevance > 0)
-        filtered_count = len([o for o in offers if o.get("relevance", 0) > 0])
+        self.stats["unique_sellers"] = len(unique_sellers)
+        if relevance_count:
+            self.stats["avg_relevance"] = relevance_sum / relevance_count
         self.stats["filtered_offers"] = filtered_count
 
     def get_statistics(self) -> Dict[str, Any]:
@@ -418,10 +579,8 @@ class TorobTwoStagePipeline:
         """
         stats = self.stats.copy()
 
-        if stats["start_time"] and stats["end_time"]:
-            stats["duration_seconds"] = (
-                stats["end_time"] - stats["start_time"]
-            ).total_seconds()
+        if self._started is not None and self._finished is not None:
+            stats["duration_seconds"] = self._finished - self._started
 
         return stats
 
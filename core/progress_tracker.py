@@ -4,14 +4,18 @@ Progress Tracker for Torob Scraper.
 Provides rich progress indicators with real-time updates and ETA.
 """
 
+import itertools
 import sys
 import threading
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
 from core.config_manager import get_config
 
+_BAR_LENGTH = 30
+
 
 class ProgressTracker:
     """Tracks and displays progress with rich formatting."""
@@ -36,14 +40,27 @@ class ProgressTracker:
         self.last_update = 0
 
         # Task details
-        self.tasks = {}  # task_id -> task_info
+        self.tasks = {}  # task_id -> task_info, for tasks still running
+        self.recent_tasks = deque(maxlen=64)  # Most recently completed task_infos
         self.current_task_id = None
+        self._subtask_ids = itertools.count()
 
         # Threading
         self._lock = threading.Lock()
         self._stop_event = threading.Event()
+        self._dirty = threading.Event()  # Set when the display is out of date
         self._update_thread = None
 
+        # Every possible progress bar, indexed by filled length
+        self._bar_cache = [
+            "█" * filled + "░" * (_BAR_LENGTH - filled)
+            for filled in range(_BAR_LENGTH + 1)
+        ]
+
+        # Terminal width, re-read at most once a second
+        self._cached_width = 80
+        self._cached_width_ts = None
+
         # Colors (if terminal supports it)
         self.colors = {
             "reset": "\033[0m",
@@ -58,20 +75,33 @@ class ProgressTracker:
             "white": "\033[37m",
         }
 
+        # stdout doesn't change between redraws, so pick the escape codes once
+        # (no colors if not a terminal)
+        reset = self.colors["reset"] if sys.stdout.isatty() else ""
+        self._color_wrap = {
+            color: (code if reset else "", reset) for color, code in self.colors.items()
+        }
+        self._no_color = ("", reset)
+
     def _colorize(self, text: str, color: str) -> str:
         """Apply color to text."""
-        if not sys.stdout.isatty():  # No colors if not a terminal
-            return text
-        return f"{self.colors.get(color, '')}{text}{self.colors['reset']}"
+        prefix, suffix = self._color_wrap.get(color, self._no_color)
+        return prefix + text + suffix
 
     def _get_terminal_width(self) -> int:
         """Get terminal width for progress bar."""
+        now = time.monotonic()
+        if self._cached_width_ts is not None and now - self._cached_width_ts <= 1.0:
+            return self._cached_width
+
         try:
             import shutil
 
-            return shutil.get_terminal_size().columns
+            self._cached_width = shutil.get_terminal_size().columns
         except:
-            return 80
+            self._cached_width = 80
+        self._cached_width_ts = now
+        return self._cached_width
 
     def _format_time(self, seconds: float) -> str:
         """Format time in a human-readable format."""
@@ -87,7 +117,7 @@ class ProgressTracker:
         if not self.start_time or self.completed_tasks == 0:
             return None
 
-        elapsed = time.time() - self.start_time
+        elapsed = time.monotonic() - self.start_time
         rate = self.completed_tasks / elapsed
         remaining = self.total_tasks - self.completed_tasks
 
@@ -99,7 +129,7 @@ class ProgressTracker:
             return
 
         with self._lock:
-            current_time = time.time()
+            current_time = time.monotonic()
 
             # Only update if enough time has passed
             if current_time - self.last_update < self.update_interval:
@@ -119,13 +149,13 @@ class ProgressTracker:
             )
 
             # Create progress bar
-            bar_length = 30
             filled_length = (
-                int(bar_length * total_processed // self.total_tasks)
+                int(_BAR_LENGTH * total_processed // self.total_tasks)
                 if self.total_tasks > 0
                 else 0
             )
-            bar = "█" * filled_length + "░" * (bar_length - filled_length)
+            # More completions than planned tasks still show a full bar
+            bar = self._bar_cache[min(filled_length, _BAR_LENGTH)]
 
             # Format progress text
             progress_text = f"🔄 {self.current_task} [{bar}] {total_processed}/{self.total_tasks} ({percentage:.1f}%)"
@@ -156,10 +186,20 @@ class ProgressTracker:
             print(self._colorize(progress_text, "cyan"), end="", flush=True)
 
     def _update_loop(self):
-        """Background thread for updating progress."""
+        """Background thread for updating progress when it changes."""
         while not self._stop_event.is_set():
+            if not self._dirty.wait(timeout=self.update_interval):
+                continue
+
+            # Coalesce bursts of changes into one redraw per update interval
+            wait = self.last_update + self.update_interval - time.monotonic()
+            if wait > 0 and self._stop_event.wait(wait):
+                break
+            if self._stop_event.is_set():
+                break
+
+            self._dirty.clear()
             self._update_display()
-            time.sleep(0.5)  # Update every 500ms
 
     def start(self, total_tasks: int, initial_task: str = "Starting..."):
         """
@@ -176,11 +216,13 @@ class ProgressTracker:
             self.total_tasks = total_tasks
             self.completed_tasks = 0
             self.failed_tasks = 0
-            self.start_time = time.time()
+            self.start_time = time.monotonic()
             self.last_update = 0
             self.current_task = initial_task
             self.tasks = {}
+            self.recent_tasks.clear()
             self.current_task_id = None
+        self._dirty.set()
 
         # Start update thread
         if not self._update_thread or not self._update_thread.is_alive():
@@ -211,8 +253,9 @@ class ProgressTracker:
                 self.tasks[task_id] = {
                     "description": task_description,
                     "details": details,
-                    "start_time": time.time(),
+                    "start_time": time.monotonic(),
                 }
+        self._dirty.set()
 
     def complete_task(self, task_id: str = None, success: bool = True):
         """
@@ -231,11 +274,15 @@ class ProgressTracker:
             else:
                 self.failed_tasks += 1
 
-            # Update task info if provided
+            # Move the finished task to the bounded history so long runs
+            # don't keep every task around
             if task_id and task_id in self.tasks:
-                self.tasks[task_id]["completed"] = True
-                self.tasks[task_id]["success"] = success
-                self.tasks[task_id]["end_time"] = time.time()
+                task_info = self.tasks.pop(task_id)
+                task_info["completed"] = True
+                task_info["success"] = success
+                task_info["end_time"] = time.monotonic()
+                self.recent_tasks.append(task_info)
+        self._dirty.set()
 
     def add_subtask(
         self, parent_task_id: str, subtask_description: str, subtask_id: str = None
@@ -252,13 +299,13 @@ class ProgressTracker:
             return
 
         if not subtask_id:
-            subtask_id = f"{parent_task_id}_sub_{len(self.tasks)}"
+            subtask_id = f"{parent_task_id}_sub_{next(self._subtask_ids)}"
 
         with self._lock:
             self.tasks[subtask_id] = {
                 "description": subtask_description,
                 "parent": parent_task_id,
-                "start_time": time.time(),
+                "start_time": time.monotonic(),
             }
 
     def update_subtask(self, subtask_id: str, details: str = None):
@@ -274,6 +321,7 @@ class ProgressTracker:
 
         with self._lock:
             self.tasks[subtask_id]["details"] = details
+        self._dirty.set()
 
     def complete_subtask(self, subtask_id: str, success: bool = True):
         """
@@ -287,9 +335,12 @@ class ProgressTracker:
             return
 
         with self._lock:
-            self.tasks[subtask_id]["completed"] = True
-            self.tasks[subtask_id]["success"] = success
-            self.tasks[subtask_id]["end_time"] = time.time()
+            task_info = self.tasks.pop(subtask_id)
+            task_info["completed"] = True
+            task_info["success"] = success
+            task_info["end_time"] = time.monotonic()
+            self.recent_tasks.append(task_info)
+        self._dirty.set()
 
     def finish(self, final_message: str = "Completed!"):
         """
@@ -301,8 +352,9 @@ class ProgressTracker:
         if not self.enabled:
             return
 
-        # Stop update thread
+        # Stop update thread, waking it if it is waiting for a change
         self._stop_event.set()
+        self._dirty.set()
         if self._update_thread and self._update_thread.is_alive():
             self._update_thread.join(timeout=1)
 
@@ -311,7 +363,7 @@ class ProgressTracker:
 
         # Show final statistics
         if self.start_time:
-            total_time = time.time() - self.start_time
+            total_time = time.monotonic() - self.start_time
             print(self._colorize(f"✅ {final_message}", "green"))
             print(
                 self._colorize(
@@ -353,7 +405,7 @@ class ProgressTracker:
             }
 
             if self.start_time:
-                stats["elapsed_time"] = time.time() - self.start_time
+                stats["elapsed_time"] = time.monotonic() - self.start_time
                 stats["eta"] = self._calculate_eta()
 
             return stats
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Task Store for the Torob Scraper web interface.
+Persists scraping task state and logs in SQLite, so they survive restarts
+and are shared by every server process on the machine using the same
+database file.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    start_time TEXT,
+    end_time TEXT,
+    progress INTEGER,
+    message TEXT,
+    excel_file TEXT,
+    stats_json TEXT,
+    error TEXT,
+    owner_pid INTEGER,
+    owner_boot_id TEXT
+);
+CREATE TABLE IF NOT EXISTS task_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    level TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS task_logs_task_id ON task_logs (task_id, id);
+"""
+
+# Task columns returned by the API, in order; NULL ones are left out
+_TASK_COLUMNS = (
+    "status",
+    "start_time",
+    "end_time",
+    "progress",
+    "message",
+    "excel_file",
+    "stats_json",
+    "error",
+)
+_SELECT_TASKS = f"SELECT id, {', '.join(_TASK_COLUMNS)} FROM tasks"
+
+
+# Columns missing from databases created before task owners were
+# recorded, with their types
+_ADDED_TASK_COLUMNS = {"owner_pid": "INTEGER", "owner_boot_id": "TEXT"}
+
+
+def _boot_id() -> str:
+    """Identify the current boot of this machine, or '' where unsupported."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id", encoding="ascii") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _process_alive(pid: int) -> bool:
+    """Check whether a process with this pid exists on this machine."""
+    if os.name == "nt":
+        # os.kill would terminate the process; assume it is still running
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
+
+
+def _json_default(obj: Any) -> str:
+    """Serialize values json can't, such as datetimes in pipeline stats."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+class TaskStore:
+    """Stores web scraping tasks and their logs in a SQLite database."""
+
+    def __init__(
+        self,
+        db_path: str = "tasks.db",
+        log_batch_size: int = 100,
+        log_flush_interval: float = 1.0,
+    ):
+        """
+        Initialize the task store.
+
+        Args:
+            db_path: SQLite database file, created if missing
+            log_batch_size: Buffered log lines that trigger a write
+            log_flush_interval: Seconds after which buffered log lines are
+                written even if the batch isn't full
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.log_batch_size = log_batch_size
+        self.log_flush_interval = log_flush_interval
+
+        # sqlite3 connections can't be shared between threads, so each
+        # thread (Flask request threads, the scraping loop) gets its own
+        self._local = threading.local()
+
+        # Log lines are written in batches; the buffer is shared by all
+        # threads of this process
+        self._log_buffer = []
+        self._log_lock = threading.Lock()
+        self._last_log_flush = time.monotonic()
+
+        conn = self._connection()
+        # WAL lets readers in other threads and processes run while a
+        # task is writing
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+        for column, column_type in _ADDED_TASK_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {column_type}")
+
+        # Running tasks record the process running them, so the ones whose
+        # process is gone can be told apart from other workers' live tasks
+        self._pid = os.getpid()
+        self._boot_id = _boot_id()
+        self._fail_orphaned_tasks()
+
+    def _fail_orphaned_tasks(self) -> None:
+        """Mark running tasks whose process has stopped as failed."""
+        orphaned = [
+            (task_id,)
+            for task_id, pid, boot_id in self._connection().execute(
+                "SELECT id, owner_pid, owner_boot_id FROM tasks"
+                " WHERE status = 'running'"
+            )
+            if pid is None or boot_id != self._boot_id or not _process_alive(pid)
+        ]
+        if not orphaned:
+            return
+
+        end_time = datetime.now().isoformat()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE tasks SET status = 'failed', end_time = ?,"
+                " message = 'Interrupted by server restart'"
+                " WHERE id = ? AND status = 'running'",
+                [(end_time, task_id) for (task_id,) in orphaned],
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's database connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed statements in one transaction."""
+        # Connections are in autocommit mode, so the transaction is explicit
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def start_task(self, task_id: str) -> None:
+        """
+        Record a task as running, replacing any earlier state and logs.
+
+        Args:
+            task_id: Task ID
+        """
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM task_logs WHERE task_id = ?", (task_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO tasks (id, status, start_time, progress,"
+                " message, owner_pid, owner_boot_id)"
+                " VALUES (?, 'running', ?, 0, 'Initializing...', ?, ?)",
+                (task_id, datetime.now().isoformat(), self._pid, self._boot_id),
+            )
+
+    def finish_task(
+        self,
+        task_id: str,
+        status: str,
+        message: str,
+        excel_file: Optional[str] = None,
+        stats: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record a task's outcome.
+
+        Args:
+            task_id: Task ID
+            status: 'completed' or 'failed'
+            message: Status message shown in the UI
+            excel_file: Results file, if one was written
+            stats: Pipeline statistics
+            error: Error message if the task failed with an exception
+        """
+        # Everything logged before the outcome should be readable with it
+        self.flush_logs()
+
+        stats_json = None
+        if stats is not None:
+            stats_json = json.dumps(stats, ensure_ascii=False, default=_json_default)
+
+        progress = 100 if status == "completed" else None
+        self._connection().execute(
+            "UPDATE tasks SET status = ?, end_time = ?,"
+            " progress = COALESCE(?, progress), message = ?, excel_file = ?,"
+            " stats_json = ?, error = ? WHERE id = ?",
+            (
+                status,
+                datetime.now().isoformat(),
+                progress,
+                message,
+                excel_file,
+                stats_json,
+                error,
+                task_id,
+            ),
+        )
+
+    def _row_to_task(self, row: tuple) -> Dict[str, Any]:
+        """Convert a tasks row (minus its id) into the API's task dict."""
+        task = {}
+        for column, value in zip(_TASK_COLUMNS, row):
+            if value is None:
+                continue
+            if column == "stats_json":
+                task["stats"] = json.loads(value)
+            else:
+                task[column] = value
+        return task
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a task's state.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            Task dict, or None if there is no such task
+        """
+        row = (
+            self._connection()
+            .execute(f"{_SELECT_TASKS} WHERE id = ?", (task_id,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return self._row_to_task(row[1:])
+
+    def list_tasks(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get every task's state.
+
+        Returns:
+            Task dicts keyed by task ID
+        """
+        rows = self._connection().execute(f"{_SELECT_TASKS} ORDER BY start_time")
+        return {row[0]: self._row_to_task(row[1:]) for row in rows}
+
+    def clear_finished(self) -> None:
+        """Delete every task that isn't running, with its logs."""
+        self.flush_logs()
+
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM task_logs WHERE task_id IN"
+                " (SELECT id FROM tasks WHERE status != 'running')"
+            )
+            conn.execute("DELETE FROM tasks WHERE status != 'running'")
+
+    def add_log(self, task_id: str, message: str, level: str = "info") -> None:
+        """
+        Add a log message to a task.
+
+        Messages are buffered and written in batches, at the latest
+        log_flush_interval seconds after the last write.
+
+        Args:
+            task_id: Task ID
+            message: Log message
+            level: Log level shown in the UI
+        """
+        entry = (task_id, datetime.now().isoformat(), level, message)
+        with self._log_lock:
+            self._log_buffer.append(entry)
+            if (
+                len(self._log_buffer) < self.log_batch_size
+                and time.monotonic() - self._last_log_flush < self.log_flush_interval
+            ):
+                return
+            self._flush_logs_locked()
+
+    def flush_logs(self) -> None:
+        """Write any buffered log messages."""
+        with self._log_lock:
+            self._flush_logs_locked()
+
+    def _flush_logs_locked(self) -> None:
+        """Write buffered log messages; the caller holds _log_lock."""
+        self._last_log_flush = time.monotonic()
+        if not self._log_buffer:
+            return
+
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO task_logs (task_id, timestamp, level, message)"
+                " VALUES (?, ?, ?, ?)",
+                self._log_buffer,
+            )
+        self._log_buffer = []
+
+    def get_logs(self, task_id: str, limit: int = 1000) -> List[Dict[str, str]]:
+        """
+        Get a task's most recent log messages, oldest first.
+
+        Args:
+            task_id: Task ID
+            limit: Maximum number of messages to return
+
+        Returns:
+            Log entries with message, level and timestamp
+        """
+        self.flush_logs()
+
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT message, level, timestamp FROM task_logs WHERE task_id = ?"
+                " ORDER BY id DESC LIMIT ?",
+                (task_id, limit),
+            )
+            .fetchall()
+        )
+        return [
+            {"message": message, "level": level, "timestamp": timestamp}
+            for message, level, timestamp in reversed(rows)
+        ]
@@ -6,12 +6,50 @@ Debug script to analyze the JSON structure in Torob's HTML.
 import asyncio
 import json
 import re
+import sys
+from itertools import islice
+from typing import Optional
 
 from adapters.torob_search import TorobScraper
-
-
-async def debug_json_structure():
-    """Analyze the JSON structure in Torob's HTML."""
+from debug_utils import block_heavy_resources, wait_for_page_load
+
+# orjson parses large payloads several times faster; it's optional (the
+# "speed" extra)
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# JSON patterns to try, compiled once
+_JSON_PATTERNS = [
+    re.compile(p, re.DOTALL)
+    for p in (
+        r'__NEXT_DATA__.*?"props":\s*({.*?})',
+        r"__NEXT_DATA__.*?({.*?})",
+        r'"products":\s*(\[.*?\])',
+        r"window\.__NEXT_DATA__\s*=\s*({.*?});",
+        r"<script[^>]*>.*?__NEXT_DATA__.*?({.*?})</script>",
+    )
+]
+_SCRIPT_RE = re.compile(r"<script[^>]*>(.*?)</script>", re.DOTALL)
+# Matched case-insensitively without lowercasing a copy of each script
+_TOROB_RE = re.compile("torob", re.IGNORECASE)
+# A JSON string literal (matched whole, so braces inside it are skipped) or
+# a brace
+_JSON_BRACE_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]', re.DOTALL)
+_PRODUCTS_KEY_RE = re.compile(r'"products"\s*:\s*\[')
+_JSON_DECODER = json.JSONDecoder()
+
+
+async def debug_json_structure(save_json: bool = False):
+    """
+    Analyze the JSON structure in Torob's HTML.
+
+    Args:
+        save_json: Parse the whole payload and save it pretty-printed
+    """
     print("🔍 Analyzing JSON Structure in Torob HTML")
     print("=" * 50)
 
@@ -20,57 +58,41 @@ async def debug_json_structure():
         search_url = "https://torob.com/search/?query=چراغ%20تیگو"
         print(f"🔍 Testing URL: {search_url}")
 
-        await scraper.page.goto(search_url, wait_until="networkidle")
-        await scraper.page.wait_for_timeout(3000)  # Wait for dynamic content
+        await block_heavy_resources(scraper.page)
+        await scraper.page.goto(search_url, wait_until="domcontentloaded")
+        await wait_for_page_load(scraper.page)
 
         # Get page content
         content = await scraper.page.content()
         print(f"📄 Page content length: {len(content)} characters")
 
+        # The Next.js payload sits in <script id="__NEXT_DATA__">; cut it out
+        # with a linear scan before trying the regex patterns
+        print(f"\n🔍 Scanning for __NEXT_DATA__ script...")
+        json_str = _extract_next_data(content)
+        found = False
+        if json_str is not None:
+            print(f"   ✅ Found JSON data! Length: {len(json_str)} characters")
+            found = analyze_json(json_str, "debug_json_next_data.json", save=save_json)
+        else:
+            print(f"   ❌ No __NEXT_DATA__ script found")
+
         # Look for different JSON patterns
-        patterns = [
-            r'__NEXT_DATA__.*?"props":\s*({.*?})',
-            r"__NEXT_DATA__.*?({.*?})",
-            r'"products":\s*(\[.*?\])',
-            r"window\.__NEXT_DATA__\s*=\s*({.*?});",
-            r"<script[^>]*>.*?__NEXT_DATA__.*?({.*?})</script>",
-        ]
-
-        for i, pattern in enumerate(patterns):
-            print(f"\n🔍 Testing pattern {i+1}: {pattern[:50]}...")
+        for i, pattern in enumerate(_JSON_PATTERNS):
+            if found:
+                break
+
+            print(f"\n🔍 Testing pattern {i+1}: {pattern.pattern[:50]}...")
             try:
-                match = re.search(pattern, content, re.DOTALL)
+                match = pattern.search(content)
                 if match:
                     json_str = match.group(1)
                     print(f"   ✅ Found JSON data! Length: {len(json_str)} characters")
 
-                    # Try to parse it
-                    try:
-                        json_data = json.loads(json_str)
-                        print(f"   ✅ JSON is valid!")
-
-                        # Save to file for analysis
-                        filename = f"debug_json_pattern_{i+1}.json"
-                        with open(filename, "w", encoding="utf-8") as f:
-                            json.dump(json_data, f, indent=2, ensure_ascii=False)
-                        print(f"   💾 Saved to {filename}")
-
-                        # Look for products in the JSON
-                        if isinstance(json_data, dict):
-                            products = find_products_in_json(json_data)
-                            if products:
-                                print(f"   🎯 Found {len(products)} products in JSON!")
-                                print(
-                                    f"   📋 Sample product keys: {list(products[0].keys()) if products else 'None'}"
-                                )
-                            else:
-                                print(f"   ⚠️  No products found in JSON structure")
-
-                        break  # Use the first working pattern
-
-                    except json.JSONDecodeError as e:
-                        print(f"   ❌ JSON decode error: {e}")
-                        print(f"   📄 First 200 chars: {json_str[:200]}")
+                    # Use the first working pattern
+                    found = analyze_json(
+                        json_str, f"debug_json_pattern_{i+1}.json", save=save_json
+                    )
 
                 else:
                     print(f"   ❌ No match found")
@@ -80,11 +102,15 @@ async def debug_json_structure():
 
         # Also look for any script tags with data
         print(f"\n🔍 Looking for script tags with data...")
-        script_tags = re.findall(r"<script[^>]*>(.*?)</script>", content, re.DOTALL)
-        print(f"   Found {len(script_tags)} script tags")
-
-        for i, script in enumerate(script_tags[:5]):  # Check first 5
-            if "products" in script or "torob" in script.lower():
+        # Only the first 5 scripts are inspected, so the rest are just
+        # counted rather than copied out of the page
+        script_matches = _SCRIPT_RE.finditer(content)
+        script_tags = [match.group(1) for match in islice(script_matches, 5)]
+        script_count = len(script_tags) + sum(1 for _ in script_matches)
+        print(f"   Found {script_count} script tags")
+
+        for i, script in enumerate(script_tags):
+            if "products" in script or _TOROB_RE.search(script):
                 print(
                     f"   📜 Script {i+1} contains relevant data (length: {len(script)})"
                 )
@@ -92,24 +118,136 @@ async def debug_json_structure():
                     print(f"      Content: {script[:200]}...")
 
 
-def find_products_in_json(data, path=""):
-    """Recursively find products array in JSON data."""
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if key == "products" and isinstance(value, list):
-                return value
-            elif isinstance(value, (dict, list)):
-                result = find_products_in_json(value, f"{path}.{key}")
-                if result:
-                    return result
-    elif isinstance(data, list):
-        for i, item in enumerate(data):
-            if isinstance(item, (dict, list)):
-                result = find_products_in_json(item, f"{path}[{i}]")
-                if result:
-                    return result
+def _extract_next_data(html: str) -> Optional[str]:
+    """
+    Extract the __NEXT_DATA__ JSON object from page HTML.
+
+    Finds the first "{" after the __NEXT_DATA__ script id and scans forward
+    to its matching "}", skipping braces inside string literals. Unlike the
+    nested lazy regex patterns this never backtracks, so it is linear in the
+    page size.
+
+    Args:
+        html: Page HTML
+
+    Returns:
+        The JSON object text, or None if it isn't found or never closes
+    """
+    start = html.find('id="__NEXT_DATA__"')
+    if start == -1:
+        return None
+    start = html.find("{", start)
+    if start == -1:
+        return None
+
+    depth = 0
+    for token in _JSON_BRACE_TOKEN_RE.finditer(html, start):
+        brace = token.group()
+        if brace == "{":
+            depth += 1
+        elif brace == "}":
+            depth -= 1
+            if depth == 0:
+                return html[start : token.end()]
+    return None
+
+
+def analyze_json(json_str: str, filename: str, save: bool = False) -> bool:
+    """
+    Report the products in extracted JSON, optionally saving all of it.
+
+    Only the products array is decoded unless save is set; the full payload
+    is several megabytes and building it as a dict just to find one list is
+    most of the cost.
+
+    Args:
+        json_str: Extracted JSON text
+        filename: File to save the parsed JSON to
+        save: Parse the whole payload and save it pretty-printed
+
+    Returns:
+        True if the JSON was valid (or, without save, held a products array)
+    """
+    if save:
+        try:
+            json_data = _json_loads(json_str)
+        except json.JSONDecodeError as e:
+            print(f"   ❌ JSON decode error: {e}")
+            print(f"   📄 First 200 chars: {json_str[:200]}")
+            return False
+
+        print(f"   ✅ JSON is valid!")
+
+        # Save to file for analysis
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(json_data, f, indent=2, ensure_ascii=False)
+        print(f"   💾 Saved to {filename}")
+
+    # Look for products in the JSON, walking the parsed data if we have it
+    products = (
+        _find_products_in_data(json_data) if save else find_products_in_json(json_str)
+    )
+    if products:
+        print(f"   🎯 Found {len(products)} products in JSON!")
+        sample = products[0]
+        print(
+            f"   📋 Sample product keys: {list(sample.keys()) if isinstance(sample, dict) else 'None'}"
+        )
+    else:
+        print(f"   ⚠️  No products found in JSON structure")
+
+    return save or products is not None
+
+
+def find_products_in_json(json_str: str) -> Optional[list]:
+    """
+    Find the first non-empty products array in JSON text.
+
+    Decodes just the array after each "products" key in document order,
+    which is the order a depth-first walk of the parsed data would visit.
+
+    Args:
+        json_str: JSON text
+
+    Returns:
+        The products list, or None if there isn't one
+    """
+    for match in _PRODUCTS_KEY_RE.finditer(json_str):
+        try:
+            value, _ = _JSON_DECODER.raw_decode(json_str, match.end() - 1)
+        except json.JSONDecodeError:
+            continue
+        if value:
+            return value
+    return None
+
+
+def _find_products_in_data(data) -> Optional[list]:
+    """
+    Find the first non-empty products array in parsed JSON data.
+
+    Walks the data depth-first in document order, the same order in which
+    find_products_in_json meets the "products" keys in the text, so both
+    report the same array.
+
+    Args:
+        data: Parsed JSON data
+
+    Returns:
+        The products list, or None if there isn't one
+    """
+    # (key, value) pairs still to visit, the next one on top
+    stack = [(None, data)]
+    while stack:
+        key, node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(reversed(node.items()))
+        elif isinstance(node, list):
+            if key == "products" and node:
+                return node
+            stack.extend((None, child) for child in reversed(node))
     return None
 
 
 if __name__ == "__main__":
-    asyncio.run(debug_json_structure())
+    asyncio.run(debug_json_structure(save_json="--save" in sys.argv))
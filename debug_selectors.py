@@ -4,9 +4,52 @@ Debug script to check CSS selectors and HTML structure.
 """
 
 import asyncio
+import os
 from urllib.parse import quote
 
 from adapters.torob_search import TorobScraper
+from debug_utils import block_heavy_resources, wait_for_page_load
+
+# Selectors to test inside the first product card, by field
+SELECTORS = {
+    "title": [
+        'a[href*="/p/"] span',
+        'a[href*="/p/"]',
+        ".ProductCard_desktop_title__3LVVm",
+        "h3",
+        "h4",
+        ".title",
+    ],
+    "link": ['a[href*="/p/"]', "a"],
+    "seller": [
+        ".ProductCard_desktop_seller__3LVVm",
+        ".seller-name",
+        ".shop-name",
+        ".store-name",
+    ],
+}
+
+# Runs in the page: maps each group's selectors to the first match's text and
+# href (or null when nothing matches)
+_PROBE_SELECTORS_JS = """
+(card, groups) => {
+    const out = {};
+    for (const [group, selectors] of Object.entries(groups)) {
+        out[group] = {};
+        for (const selector of selectors) {
+            try {
+                const el = card.querySelector(selector);
+                out[group][selector] = el
+                    ? {text: el.textContent || "", href: el.getAttribute("href")}
+                    : null;
+            } catch (e) {
+                out[group][selector] = {error: String(e)};
+            }
+        }
+    }
+    return out;
+}
+"""
 
 
 async def debug_selectors():
@@ -21,7 +64,9 @@ async def debug_selectors():
         search_url = f"{scraper.base_url}/search/?query={encoded_keywords}"
 
         print(f"🔍 Searching: {search_url}")
-        await scraper.page.goto(search_url, wait_until="networkidle")
+        await block_heavy_resources(scraper.page)
+        await scraper.page.goto(search_url, wait_until="domcontentloaded")
+        await wait_for_page_load(scraper.page)
         await scraper._random_delay()
 
         # Check for product cards
@@ -29,74 +74,54 @@ async def debug_selectors():
         card_count = await product_cards.count()
         print(f"📊 Found {card_count} product cards")
 
+        save_html = None
         if card_count > 0:
             # Get first card
             first_card = product_cards.first
 
-            # Check title selectors
-            print("\n🔍 Testing title selectors:")
-            for selector in [
-                'a[href*="/p/"] span',
-                'a[href*="/p/"]',
-                ".ProductCard_desktop_title__3LVVm",
-                "h3",
-                "h4",
-                ".title",
-            ]:
-                try:
-                    element = first_card.locator(selector).first
-                    count = await element.count()
-                    if count > 0:
-                        text = await element.text_content()
-                        print(f"   ✅ {selector}: '{text[:50]}...'")
-                    else:
-                        print(f"   ❌ {selector}: No elements found")
-                except Exception as e:
-                    print(f"   ❌ {selector}: Error - {e}")
-
-            # Check link selectors
-            print("\n🔍 Testing link selectors:")
-            for selector in ['a[href*="/p/"]', "a"]:
-                try:
-                    element = first_card.locator(selector).first
-                    count = await element.count()
-                    if count > 0:
-                        href = await element.get_attribute("href")
-                        print(f"   ✅ {selector}: '{href}'")
-                    else:
+            # Probe every selector inside the card in one round-trip
+            results = await first_card.evaluate(_PROBE_SELECTORS_JS, SELECTORS)
+
+            for group, selectors in SELECTORS.items():
+                print(f"\n🔍 Testing {group} selectors:")
+                for selector in selectors:
+                    result = results[group][selector]
+                    if result is None:
                         print(f"   ❌ {selector}: No elements found")
-                except Exception as e:
-                    print(f"   ❌ {selector}: Error - {e}")
-
-            # Check seller selectors
-            print("\n🔍 Testing seller selectors:")
-            for selector in [
-                ".ProductCard_desktop_seller__3LVVm",
-                ".seller-name",
-                ".shop-name",
-                ".store-name",
-            ]:
-                try:
-                    element = first_card.locator(selector).first
-                    count = await element.count()
-                    if count > 0:
-                        text = await element.text_content()
-                        print(f"   ✅ {selector}: '{text}'")
+                    elif "error" in result:
+                        print(f"   ❌ {selector}: Error - {result['error']}")
+                    elif group == "link":
+                        print(f"   ✅ {selector}: '{result['href']}'")
+                    elif group == "title":
+                        print(f"   ✅ {selector}: '{result['text'][:50]}...'")
                     else:
-                        print(f"   ❌ {selector}: No elements found")
-                except Exception as e:
-                    print(f"   ❌ {selector}: Error - {e}")
+                        print(f"   ✅ {selector}: '{result['text']}'")
 
-            # Get page HTML for manual inspection
+            # Get page HTML for manual inspection; the file is written in a
+            # worker thread while the browser may stay open below
             print("\n🔍 Getting page HTML for inspection...")
             html = await scraper.page.content()
-            with open("debug_page.html", "w", encoding="utf-8") as f:
-                f.write(html)
+            loop = asyncio.get_running_loop()
+            save_html = loop.run_in_executor(None, _write_text, "debug_page.html", html)
+
+        # Keep browser open for manual inspection if asked to, for
+        # DEBUG_SELECTORS_INSPECT seconds
+        inspect_seconds = float(os.environ.get("DEBUG_SELECTORS_INSPECT") or 0)
+        if inspect_seconds > 0:
+            print(
+                f"\n⏸️  Browser will stay open for {inspect_seconds:g} seconds for manual inspection..."
+            )
+            await asyncio.sleep(inspect_seconds)
+
+        if save_html is not None:
+            await save_html
             print("   📄 Saved page HTML to debug_page.html")
 
-        # Keep browser open for manual inspection
-        print("\n⏸️  Browser will stay open for 10 seconds for manual inspection...")
-        await asyncio.sleep(10)
+
+def _write_text(path: str, text: str):
+    """Write text to a UTF-8 file."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Page helpers shared by the debug scripts.
+Speed up loading Torob pages in Playwright when inspecting them by hand.
+"""
+
+import asyncio
+import time
+
+from playwright.async_api import Page
+
+# Third-party hosts and file types that keep loading long after the page
+# content is usable; ignored when waiting for a page to settle
+_FILTERED_DOMAINS = [
+    "doubleclick.net",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "hotjar.com",
+    "clarity.ms",
+    "yektanet.com",
+    "facebook.net",
+]
+_FILTERED_EXTENSIONS = [".gif", ".woff", ".woff2", ".ico"]
+# Request types not needed to read a page's DOM
+_BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+
+# Runs in the page: the document's readyState and how many resources other
+# than the filtered ones have finished loading
+_PAGE_LOAD_STATE_JS = """
+([domains, extensions]) => {
+    const loaded = performance.getEntriesByType("resource").filter((entry) => {
+        const url = entry.name.split("?")[0];
+        return !domains.some((domain) => url.includes(domain))
+            && !extensions.some((ext) => url.endsWith(ext));
+    });
+    return [document.readyState, loaded.length];
+}
+"""
+
+
+async def block_heavy_resources(page: Page):
+    """
+    Abort the page's requests for images, fonts, media, stylesheets and
+    analytics, which the page's text and links don't depend on.
+
+    Args:
+        page: Page to route requests for
+    """
+
+    async def handle(route):
+        request = route.request
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(
+            domain in request.url for domain in _FILTERED_DOMAINS
+        ):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", handle)
+
+
+async def wait_for_page_load(
+    page: Page, quiet_period: float = 0.5, timeout: float = 10.0
+):
+    """
+    Wait for a page to settle after a domcontentloaded navigation.
+
+    Unlike networkidle this ignores analytics and tracker requests, which
+    on Torob keep connections open until the navigation timeout.
+
+    Args:
+        page: Page to wait for
+        quiet_period: Seconds without a new resource finishing to count
+            as settled
+        timeout: Maximum seconds to wait
+    """
+    deadline = time.monotonic() + timeout
+    last_count = -1
+    last_change = time.monotonic()
+
+    while time.monotonic() < deadline:
+        ready_state, count = await page.evaluate(
+            _PAGE_LOAD_STATE_JS, [_FILTERED_DOMAINS, _FILTERED_EXTENSIONS]
+        )
+        now = time.monotonic()
+        if count != last_count:
+            last_count = count
+            last_change = now
+        elif ready_state == "complete" and now - last_change >= quiet_period:
+            return
+        await asyncio.sleep(0.1)
@@ -14,11 +14,18 @@ Examples:
 
 import argparse
 import asyncio
+import os
 import sys
+import threading
+from importlib.util import find_spec
 from pathlib import Path
+from typing import Optional
 
 from core.pipeline import ScrapingPipeline
 
+# Columns every input CSV must have
+_REQUIRED_COLUMNS = frozenset({"part_id", "part_name", "keywords"})
+
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -82,6 +89,56 @@ Output:
     return parser.parse_args()
 
 
+async def _async_input(prompt: str) -> str:
+    """
+    Read a line from stdin without blocking the event loop.
+
+    The line is read with os.read in a daemon thread. Neither input() nor
+    the default executor fits: a thread blocked in input() holds stdin's
+    buffer lock, which crashes interpreter shutdown after Ctrl+C, and
+    executor threads are joined at exit, which hangs until Enter.
+
+    Args:
+        prompt: Text to show before reading
+
+    Returns:
+        The line read, without its newline
+
+    Raises:
+        EOFError: If stdin is closed before a line is read
+    """
+    print(prompt, end="", flush=True)
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(line: Optional[str]):
+        if future.done():
+            return
+        if line is None:
+            future.set_exception(EOFError())
+        else:
+            future.set_result(line)
+
+    def read_line():
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = os.read(sys.stdin.fileno(), 1024)
+            if not chunk:
+                break
+            data += chunk
+        line = None
+        if data:
+            encoding = sys.stdin.encoding or "utf-8"
+            line = data.decode(encoding, "replace").rstrip("\r\n")
+        try:
+            loop.call_soon_threadsafe(settle, line)
+        except RuntimeError:
+            pass  # The loop closed while the user was still typing
+
+    threading.Thread(target=read_line, daemon=True).start()
+    return await future
+
+
 def validate_input_file(file_path: str) -> bool:
     """
     Validate that input CSV file exists and has required columns.
@@ -100,18 +157,21 @@ def validate_input_file(file_path: str) -> bool:
         import csv
 
         with open(file_path, "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            required_columns = {"part_id", "part_name", "keywords"}
-
-            if not required_columns.issubset(set(reader.fieldnames or [])):
-                missing = required_columns - set(reader.fieldnames or [])
-                print(f"❌ Error: Missing required columns in {file_path}: {missing}")
-                print(f"Required columns: {required_columns}")
-                print(f"Found columns: {reader.fieldnames}")
+            # Plain rows: the header is all that's checked, so building a
+            # dict per row only to count them is wasted work
+            reader = csv.reader(file)
+            fieldnames = next(reader, [])
+            missing = _REQUIRED_COLUMNS.difference(fieldnames)
+            if missing:
+                print(
+                    f"❌ Error: Missing required columns in {file_path}: {', '.join(sorted(missing))}"
+                )
+                print(f"Required columns: {', '.join(sorted(_REQUIRED_COLUMNS))}")
+                print(f"Found columns: {fieldnames}")
                 return False
 
-            # Check if file has any data
-            row_count = sum(1 for row in reader)
+            # Check if file has any data (blank lines aren't parts)
+            row_count = sum(1 for row in reader if row)
             if row_count == 0:
                 print(f"❌ Error: Input file {file_path} contains no data rows")
                 return False
@@ -128,28 +188,19 @@ def setup_environment():
     """Check and setup required environment."""
     print("🔧 Checking environment...")
 
-    # Check if playwright is available
-    try:
-        from playwright.sync_api import sync_playwright
-
-        print("✅ Playwright available")
-    except ImportError as e:
+    # Look the packages up without importing them; importing pandas alone
+    # takes a noticeable part of startup
+    if find_spec("playwright") is None:
         print("❌ Error: Playwright not installed")
         print("Please install with: pip install playwright")
         return False
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+    print("✅ Playwright available")
 
     # Check required packages
-    required_packages = ["pandas", "openpyxl", "asyncio"]
-    missing_packages = []
-
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(package)
+    required_packages = ["pandas", "openpyxl"]
+    missing_packages = [
+        package for package in required_packages if find_spec(package) is None
+    ]
 
     if missing_packages:
         print(f"❌ Error: Missing required packages: {missing_packages}")
@@ -194,11 +245,11 @@ async def main():
 
     # Confirm execution
     try:
-        response = input("\n❓ Start scraping? [y/N]: ").strip().lower()
-        if response not in ["y", "yes"]:
+        response = await _async_input("\n❓ Start scraping? [y/N]: ")
+        if response.strip().lower() not in ["y", "yes"]:
             print("❌ Scraping cancelled by user")
             sys.exit(0)
-    except (KeyboardInterrupt, EOFError):
+    except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
         print("\n❌ Scraping cancelled by user")
         sys.exit(0)
 
@@ -247,6 +298,15 @@ if __name__ == "__main__":
     # Handle Windows event loop policy issue
     if sys.platform.startswith("win"):
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    else:
+        # uvloop's libuv-based loop has less overhead per await; it's
+        # optional, so fall back to the default loop without it
+        try:
+            import uvloop
+
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
 
     # Run the main function
     asyncio.run(main())
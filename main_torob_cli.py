@@ -9,6 +9,9 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+from playwright.async_api import async_playwright
+
+from adapters.torob_search import launch_browser
 from core.cli_enhancer import get_cli_enhancer
 from core.config_manager import get_config
 from core.pipeline_torob import TorobTwoStagePipeline
@@ -117,6 +120,8 @@ def get_multiple_parts_input():
 
     parts_data = []
     excel_filename = None
+    # One timestamp for the batch; the part number keeps the IDs unique
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     for i in range(num_parts):
         cli.print_section(f"Part {i+1} of {num_parts}")
@@ -153,7 +158,7 @@ def get_multiple_parts_input():
 
         # Create part data
         part_data = {
-            "part_id": f"part_{i+1}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "part_id": f"part_{i+1}_{timestamp}",
             "part_name": inputs["part_name"],
             "part_code": inputs["part_code"],
             "keywords": inputs["custom_keywords"],
@@ -173,17 +178,16 @@ def get_multiple_parts_input():
     return excel_filename, parts_data
 
 
-async def run_pipeline(parts_data, excel_filename):
+async def run_pipeline(parts_data, excel_filename, browser=None):
     """Run the scraping pipeline."""
     cli = get_cli_enhancer()
 
     # Create pipeline
-    pipeline = TorobTwoStagePipeline(parts_data, excel_filename)
+    pipeline = TorobTwoStagePipeline(parts_data, excel_filename, browser=browser)
 
-    # Estimate processing time
-    estimated_time = (
-        f"{len(parts_data) * 2} minutes" if len(parts_data) > 1 else "2 minutes"
-    )
+    # Estimate processing time (parts are scraped several at a time)
+    rounds = -(-len(parts_data) // pipeline.concurrency)
+    estimated_time = f"{rounds * 2} minutes"
 
     # Confirm processing
     if not cli.confirm_processing(len(parts_data), estimated_time):
@@ -200,9 +204,10 @@ async def run_pipeline(parts_data, excel_filename):
         # Show processing stats
         cli.show_processing_stats(pipeline.stats)
 
-        # Show export summary
+        # Show export summary; large runs are split over several files
+        output_files = ", ".join(pipeline.stats.get("output_files") or [excel_filename])
         export_info = {
-            "filename": excel_filename,
+            "filename": output_files,
             "total_rows": pipeline.stats.get("final_offers", 0),
             "unique_sellers": pipeline.stats.get("unique_sellers", 0),
             "unique_parts": pipeline.stats.get("unique_parts", 0),
@@ -211,7 +216,7 @@ async def run_pipeline(parts_data, excel_filename):
         cli.show_export_summary(export_info)
 
         cli.print_success(
-            f"Pipeline completed successfully! Results saved to {excel_filename}"
+            f"Pipeline completed successfully! Results saved to {output_files}"
         )
         return True
 
@@ -246,42 +251,55 @@ async def main():
     cli = get_cli_enhancer()
 
     try:
-        while True:
-            choice = show_main_menu()
-
-            if choice == "1":
-                # Single part processing
-                excel_filename, part_data = get_user_input()
-                await run_pipeline([part_data], excel_filename)
-
-            elif choice == "2":
-                # Multiple parts processing
-                excel_filename, parts_data = get_multiple_parts_input()
-                await run_pipeline(parts_data, excel_filename)
-
-            elif choice == "3":
-                # Show configuration
-                config = get_config()
-                cli.show_configuration_summary(config.config)
-
-            elif choice == "4":
-                # Show help
-                cli.show_help()
-
-            elif choice == "5":
-                # Exit
-                cli.print_info("Thank you for using Torob Scraper!")
-                break
-
-            # Ask if user wants to continue
-            if choice in ["1", "2"]:
-                if not cli.get_yes_no(
-                    "Do you want to process another part?", default=False
-                ):
-                    cli.print_info("Thank you for using Torob Scraper!")
-                    break
-
-            print()  # Add spacing between iterations
+        # One browser serves every run; each pipeline opens its own context
+        # in it, so only the first run pays for starting Chromium. It is
+        # launched on the first run, so the other options work without it.
+        async with async_playwright() as playwright:
+            browser = None
+            try:
+                while True:
+                    choice = show_main_menu()
+
+                    if choice == "1":
+                        # Single part processing
+                        excel_filename, part_data = get_user_input()
+                        if browser is None:
+                            browser = await launch_browser(playwright)
+                        await run_pipeline([part_data], excel_filename, browser)
+
+                    elif choice == "2":
+                        # Multiple parts processing
+                        excel_filename, parts_data = get_multiple_parts_input()
+                        if browser is None:
+                            browser = await launch_browser(playwright)
+                        await run_pipeline(parts_data, excel_filename, browser)
+
+                    elif choice == "3":
+                        # Show configuration
+                        config = get_config()
+                        cli.show_configuration_summary(config.config)
+
+                    elif choice == "4":
+                        # Show help
+                        cli.show_help()
+
+                    elif choice == "5":
+                        # Exit
+                        cli.print_info("Thank you for using Torob Scraper!")
+                        break
+
+                    # Ask if user wants to continue
+                    if choice in ["1", "2"]:
+                        if not cli.get_yes_no(
+                            "Do you want to process another part?", default=False
+                        ):
+                            cli.print_info("Thank you for using Torob Scraper!")
+                            break
+
+                    print()  # Add spacing between iterations
+            finally:
+                if browser is not None:
+                    await browser.close()
 
     except KeyboardInterrupt:
         cli.print_warning("\n\nOperation cancelled by user.")
@@ -297,5 +315,14 @@ if __name__ == "__main__":
         cli.show_help()
         sys.exit(0)
 
+    # Use uvloop's faster event loop where it's installed
+    if not sys.platform.startswith("win"):
+        try:
+            import uvloop
+
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
+
     # Run the main CLI
     asyncio.run(main())
@@ -81,6 +81,11 @@ setup(
             "pytest-mock>=3.10.0",
             "httpx>=0.24.0",
         ],
+        # Optional speedups, used automatically when installed
+        "speed": [
+            "orjson>=3.8.0",
+            'uvloop>=0.17.0; sys_platform != "win32"',
+        ],
     },
     entry_points={
         "console_scripts": [
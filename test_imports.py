@@ -1,114 +1,75 @@
 #!/usr/bin/env python3
 """
-Test script to verify all imports work and URL extraction is functional.
-"""
-
+Tests to verify all imports work and URL extraction is functional.
 
-def test_imports():
-    """Test all required imports."""
-    print("🔍 Testing Imports...")
+URL extraction needs a browser and network access, so this module sits
+outside tests/ and is run on its own: pytest test_imports.py
+"""
 
-    try:
-        import playwright.async_api
+import asyncio
+import importlib
+import sys
 
-        print("✅ playwright.async_api imported successfully")
-    except ImportError as e:
-        print(f"❌ playwright.async_api import failed: {e}")
-        return False
+import pytest
 
-    try:
-        import pandas
+# Modules the scraper needs, with a name each must provide (if any)
+REQUIRED_IMPORTS = [
+    ("playwright.async_api", None),
+    ("pandas", None),
+    ("numpy", None),
+    ("adapters.torob_search", "TorobScraper"),
+    ("core.exporter_excel", "ExcelExporter"),
+]
 
-        print("✅ pandas imported successfully")
-    except ImportError as e:
-        print(f"❌ pandas import failed: {e}")
-        return False
 
-    try:
-        import numpy
+@pytest.mark.parametrize("module_name, attribute", REQUIRED_IMPORTS)
+def test_imports(module_name, attribute):
+    """Test that a required module imports."""
+    module = importlib.import_module(module_name)
 
-        print("✅ numpy imported successfully")
-    except ImportError as e:
-        print(f"❌ numpy import failed: {e}")
-        return False
+    if attribute is not None:
+        assert hasattr(module, attribute), f"{module_name} has no {attribute}"
 
-    try:
-        from adapters.torob_search import TorobScraper
 
-        print("✅ TorobScraper imported successfully")
-    except ImportError as e:
-        print(f"❌ TorobScraper import failed: {e}")
-        return False
+@pytest.fixture(scope="session")
+def event_loop_for_scraper():
+    """Event loop the shared scraper runs on."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
-    try:
-        from core.exporter_excel import ExcelExporter
 
-        print("✅ ExcelExporter imported successfully")
-    except ImportError as e:
-        print(f"❌ ExcelExporter import failed: {e}")
-        return False
+@pytest.fixture(scope="session")
+def scraper(event_loop_for_scraper):
+    """One started scraper for the session, so the browser launches once."""
+    from adapters.torob_search import TorobScraper
 
-    print("\n🎉 All imports successful!")
-    return True
+    scraper = TorobScraper(headless=True)
+    event_loop_for_scraper.run_until_complete(scraper.start())
+    yield scraper
+    event_loop_for_scraper.run_until_complete(scraper.close())
 
 
-def test_url_extraction():
+@pytest.mark.integration
+def test_url_extraction(scraper, event_loop_for_scraper):
     """Test URL extraction functionality."""
-    print("\n🔍 Testing URL Extraction...")
-
-    try:
-        import asyncio
-
-        from adapters.torob_search import TorobScraper
-
-        async def test_scraper():
-            async with TorobScraper(headless=True) as scraper:
-                # Test search
-                results = await scraper.search_parts(
-                    "چراغ سمت راست تیگو ۸ پرو", max_scroll_attempts=1
-                )
-
-                print(f"📊 Found {len(results)} products")
-
-                if results:
-                    print("\n📋 Sample results:")
-                    for i, result in enumerate(results[:3]):  # Show first 3
-                        print(
-                            f"   {i+1}. Title: {result.get('title_raw', 'N/A')[:50]}..."
-                        )
-                        print(f"      URL: {result.get('product_url', 'N/A')}")
-                        print(f"      Price: {result.get('price_raw', 'N/A')}")
-                        print(f"      Seller: {result.get('seller_name', 'N/A')}")
-                        print()
+    results = event_loop_for_scraper.run_until_complete(
+        scraper.search_parts("چراغ سمت راست تیگو ۸ پرو", max_scroll_attempts=1)
+    )
 
-                return len(results) > 0
+    print(f"📊 Found {len(results)} products")
 
-        result = asyncio.run(test_scraper())
-        if result:
-            print("✅ URL extraction working!")
-        else:
-            print("❌ No products found")
-        return result
+    if results:
+        print("\n📋 Sample results:")
+        for i, result in enumerate(results[:3]):  # Show first 3
+            print(f"   {i+1}. Title: {result.get('title_raw', 'N/A')[:50]}...")
+            print(f"      URL: {result.get('product_url', 'N/A')}")
+            print(f"      Price: {result.get('price_raw', 'N/A')}")
+            print(f"      Seller: {result.get('seller_name', 'N/A')}")
+            print()
 
-    except Exception as e:
-        print(f"❌ URL extraction test failed: {e}")
-        return False
+    assert results, "No products found"
 
 
 if __name__ == "__main__":
-    print("🚀 Testing Torob Scraper Environment")
-    print("=" * 50)
-
-    # Test imports
-    imports_ok = test_imports()
-
-    if imports_ok:
-        # Test URL extraction
-        url_ok = test_url_extraction()
-
-        if url_ok:
-            print("\n🎉 All tests passed! The scraper is ready to use.")
-        else:
-            print("\n⚠️  Imports work but URL extraction needs attention.")
-    else:
-        print("\n❌ Import issues need to be resolved first.")
+    sys.exit(pytest.main([__file__, "-v", "-s"]))
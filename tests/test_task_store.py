@@ -0,0 +1,124 @@
+"""
+Tests for the SQLite task store.
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from core.task_store import TaskStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Task store on a fresh database file."""
+    return TaskStore(tmp_path / "tasks.db")
+
+
+class TestTaskStore:
+    """Test task state and log persistence."""
+
+    def test_start_and_finish_task(self, store):
+        """Test a task's state through start and finish."""
+        store.start_task("t1")
+        task = store.get_task("t1")
+        assert task["status"] == "running"
+        assert task["progress"] == 0
+        assert "end_time" not in task
+
+        store.finish_task(
+            "t1",
+            "completed",
+            "Done",
+            excel_file="out.xlsx",
+            stats={"final_offers": 3},
+        )
+        task = store.get_task("t1")
+        assert task["status"] == "completed"
+        assert task["progress"] == 100
+        assert task["excel_file"] == "out.xlsx"
+        assert task["stats"] == {"final_offers": 3}
+        assert "end_time" in task
+
+        assert store.get_task("missing") is None
+        assert list(store.list_tasks()) == ["t1"]
+
+    def test_get_logs_limit_and_order(self, store):
+        """Test that get_logs returns the most recent messages, oldest first."""
+        store.start_task("t1")
+        for i in range(5):
+            store.add_log("t1", f"message {i}")
+
+        logs = store.get_logs("t1")
+        assert [log["message"] for log in logs] == [f"message {i}" for i in range(5)]
+
+        logs = store.get_logs("t1", limit=2)
+        assert [log["message"] for log in logs] == ["message 3", "message 4"]
+
+    def test_clear_finished(self, store):
+        """Test that only finished tasks are cleared, with their logs."""
+        store.start_task("running")
+        store.start_task("done")
+        store.add_log("running", "still going")
+        store.add_log("done", "finished")
+        store.finish_task("done", "completed", "Done")
+
+        store.clear_finished()
+
+        assert store.get_task("done") is None
+        assert store.get_logs("done") == []
+        assert store.get_task("running")["status"] == "running"
+        assert [log["message"] for log in store.get_logs("running")] == ["still going"]
+
+    def test_logs_from_several_threads(self, tmp_path):
+        """Test that buffered logs added from several threads are all written."""
+        store = TaskStore(tmp_path / "tasks.db", log_batch_size=7)
+        store.start_task("t1")
+
+        def log_lines(thread_index):
+            for i in range(50):
+                store.add_log("t1", f"{thread_index}-{i}")
+
+        threads = [threading.Thread(target=log_lines, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        messages = {log["message"] for log in store.get_logs("t1")}
+        assert messages == {f"{n}-{i}" for n in range(4) for i in range(50)}
+
+    @pytest.mark.skipif(os.name == "nt", reason="process liveness is POSIX-only")
+    def test_stale_running_tasks_fail_on_open(self, tmp_path):
+        """Test that tasks left running by a stopped server can be cleared."""
+        db_path = tmp_path / "tasks.db"
+        TaskStore(db_path).start_task("t1")
+
+        # Hand the task to a process that has since exited
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE tasks SET owner_pid = ?", (process.pid,))
+
+        store = TaskStore(db_path)
+        assert store.get_task("t1")["status"] == "failed"
+
+        store.clear_finished()
+        assert store.get_task("t1") is None
+
+    def test_stores_sharing_a_file(self, tmp_path):
+        """Test that opening a store keeps another live store's tasks running."""
+        db_path = tmp_path / "tasks.db"
+        first = TaskStore(db_path)
+        first.start_task("t1")
+
+        second = TaskStore(db_path)
+        assert second.get_task("t1")["status"] == "running"
+
+        second.clear_finished()
+        first.finish_task("t1", "completed", "Done")
+        assert second.get_task("t1")["status"] == "completed"
@@ -9,6 +9,8 @@ from utils.text import (
     detect_currency_unit,
     extract_price,
     normalize_digits,
+    normalize_part_title,
+    normalize_seller_name,
 )
 
 
@@ -47,6 +49,10 @@ class TestTextUtils:
         assert extract_price("۱۲۳,۰۰۰ تومان") == 123000
         assert extract_price("123000") == 123000
 
+        # Arabic presentation forms and fullwidth digits
+        assert extract_price("۱۲۳,۰۰۰ ﺗﻮﻣﺎﻥ") == 123000
+        assert extract_price("１２３,０００ ﺭﯾﺎﻝ") == 123000
+
         # Invalid prices
         assert extract_price("تماس بگیرید") == 0
         assert extract_price("") == 0
@@ -57,4 +63,18 @@ class TestTextUtils:
         assert detect_currency_unit("123,000 تومان") == "toman"
         assert detect_currency_unit("123,000 ریال") == "rial"
         assert detect_currency_unit("123,000") == "unknown"
+
+        # Arabic presentation forms
+        assert detect_currency_unit("۱۲۳ ﺗﻮﻣﺎﻥ") == "toman"
+        assert detect_currency_unit("۱۲۳ ﺭﯾﺎﻝ") == "rial"
         assert detect_currency_unit("") == "unknown"
+
+    def test_normalize_letter_variants(self):
+        """Test that Arabic letter variants normalize like the Persian forms."""
+        assert normalize_seller_name("فروشگاه علي") == normalize_seller_name(
+            "فروشگاه علی"
+        )
+        assert normalize_seller_name("كيا موتور") == normalize_seller_name("کیا موتور")
+        assert normalize_part_title("چراغ جلو كيا") == normalize_part_title(
+            "چراغ جلو کیا"
+        )
@@ -0,0 +1,56 @@
+"""
+Tests for the web interface endpoints.
+
+These talk to a running server (python3 web_app.py) and are skipped when
+none is listening.
+"""
+
+import pytest
+import requests
+
+BASE_URL = "http://localhost:5001"
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    """Base URL of the running web interface."""
+    return BASE_URL
+
+
+@pytest.fixture(scope="module")
+def http(base_url):
+    """One session for the module, so the requests reuse a keep-alive connection."""
+    session = requests.Session()
+    try:
+        session.get(f"{base_url}/", timeout=5)
+    except requests.exceptions.ConnectionError:
+        session.close()
+        pytest.skip("Web server not running. Start with: python3 web_app.py")
+
+    yield session
+    session.close()
+
+
+@pytest.mark.integration
+class TestWebInterface:
+    """Test the web interface endpoints."""
+
+    def test_main_page(self, http, base_url):
+        """Test that the main page is served."""
+        response = http.get(f"{base_url}/")
+        assert response.status_code == 200
+
+    def test_config_api(self, http, base_url):
+        """Test the configuration API."""
+        response = http.get(f"{base_url}/api/config")
+        assert response.status_code == 200
+
+        config = response.json()
+        assert "scraping" in config
+        assert "caching" in config
+
+    def test_tasks_api(self, http, base_url):
+        """Test the tasks API."""
+        response = http.get(f"{base_url}/api/tasks")
+        assert response.status_code == 200
+        assert isinstance(response.json(), dict)
@@ -3,6 +3,8 @@ Text utilities for normalizing Persian/Arabic text and extracting prices.
 """
 
 import re
+import unicodedata
+from functools import lru_cache
 from typing import Optional, Union
 
 # Persian and Arabic digit mappings
@@ -32,11 +34,70 @@ ARABIC_DIGITS = {
     "٩": "9",
 }
 
+# Both digit sets as one translation table, applied in a single pass
+_DIGIT_TABLE = str.maketrans({**PERSIAN_DIGITS, **ARABIC_DIGITS})
+
+# Arabic letter variants mapped to the Persian forms, so two spellings of a
+# name normalize to the same key
+_LETTER_TABLE = str.maketrans(
+    {
+        "ي": "ی",
+        "ى": "ی",
+        "ك": "ک",
+        "ة": "ه",
+        "إ": "ا",
+        "أ": "ا",
+        "آ": "ا",
+    }
+)
+
 # Common price separators and currency indicators
 PRICE_SEPARATORS = [",", "،", ".", " "]
-CURRENCY_INDICATORS = ["تومان", "ریال", "ﺗﻮﻣﺎﻥ", "ﺭﯾﺎﻝ", "تومن", "ریل"]
-
-
+# Deletes every separator in one pass
+_PRICE_SEPARATOR_TABLE = str.maketrans("", "", "".join(PRICE_SEPARATORS))
+# Canonical forms only: text is NFKC-normalized before it is searched, which
+# folds Arabic presentation forms (e.g. "ﺗﻮﻣﺎﻥ") into them
+CURRENCY_INDICATORS = ["تومان", "ریال", "تومن", "ریل"]
+TOMAN_INDICATORS = ["تومان", "تومن"]
+RIAL_INDICATORS = ["ریال", "ریل"]
+
+# Words that don't help tell part titles apart
+NOISE_WORDS = ["اصل", "اصلی", "یدکی", "قطعه", "پارت", "part", "oem", "original"]
+
+# Seller name affixes that don't identify the seller
+SELLER_PREFIXES = ["فروشگاه", "شرکت", "گروه", "مجموعه"]
+SELLER_SUFFIXES = ["store", "shop", "group", "co"]
+
+# Regexes used on every call, compiled once
+_WHITESPACE_RE = re.compile(r"\s+")
+_PRICE_PATTERNS = [
+    re.compile(r"(\d{1,3}(?:[,،]\d{3})*(?:\.\d{2})?)"),  # 1,000,000 or 1,000.50
+    re.compile(r"(\d+)"),  # Simple number
+]
+# Indicator lists as single alternations, so text is scanned once per list
+_CURRENCY_INDICATORS_RE = re.compile("|".join(map(re.escape, CURRENCY_INDICATORS)))
+_TOMAN_INDICATORS_RE = re.compile("|".join(map(re.escape, TOMAN_INDICATORS)))
+_RIAL_INDICATORS_RE = re.compile("|".join(map(re.escape, RIAL_INDICATORS)))
+# Each affix is stripped at most once, in list order (so "فروشگاه شرکت x"
+# loses both prefixes but "شرکت فروشگاه x" only the first)
+_SELLER_PREFIX_RE = re.compile(
+    "^" + "".join(rf"(?:{re.escape(prefix)}\s*)?" for prefix in SELLER_PREFIXES)
+)
+_SELLER_SUFFIX_RE = re.compile(
+    "".join(rf"(?:\s*{re.escape(suffix)})?" for suffix in reversed(SELLER_SUFFIXES))
+    + "$"
+)
+# All noise words in one alternation, so a title is scanned once
+_NOISE_WORDS_RE = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, NOISE_WORDS)) + r")\b", re.IGNORECASE
+)
+
+# Scraped seller names and titles repeat a lot across rows, so the pure
+# normalizers below remember their results
+_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
 def normalize_digits(text: str) -> str:
     """
     Convert Persian and Arabic digits to Latin digits.
@@ -50,15 +111,7 @@ def normalize_digits(text: str) -> str:
     if not text:
         return text
 
-    # Replace Persian digits
-    for persian, latin in PERSIAN_DIGITS.items():
-        text = text.replace(persian, latin)
-
-    # Replace Arabic digits
-    for arabic, latin in ARABIC_DIGITS.items():
-        text = text.replace(arabic, latin)
-
-    return text
+    return text.translate(_DIGIT_TABLE)
 
 
 def clean_whitespace(text: str) -> str:
@@ -75,7 +128,7 @@ def clean_whitespace(text: str) -> str:
         return text
 
     # Replace multiple whitespace with single space
-    text = re.sub(r"\s+", " ", text)
+    text = _WHITESPACE_RE.sub(" ", text)
 
     # Strip leading/trailing whitespace
     text = text.strip()
@@ -96,43 +149,31 @@ def extract_price(text: str) -> int:
     if not text:
         return 0
 
-    # Normalize digits first
-    text = normalize_digits(text)
-
-    # Remove currency indicators
-    for indicator in CURRENCY_INDICATORS:
-        text = text.replace(indicator, "")
+    # ASCII text has no presentation forms, Persian/Arabic digits or
+    # currency indicators, so it can be searched as is
+    if not text.isascii():
+        # Fold presentation forms, then normalize digits
+        text = normalize_digits(unicodedata.normalize("NFKC", text))
 
-    # Find all numeric sequences (with potential separators)
-    price_patterns = [
-        r"(\d{1,3}(?:[,،]\d{3})*(?:\.\d{2})?)",  # 1,000,000 or 1,000.50
-        r"(\d+)",  # Simple number
-    ]
+        # Remove currency indicators
+        text = _CURRENCY_INDICATORS_RE.sub("", text)
 
-    potential_prices = []
+    # Keep the largest price found (assuming it's the main price). Both
+    # patterns are needed: the first one splits a plain "123456" into "123"
+    # and "456", and the second one splits "1,000,000" at the separators.
+    best_price = 0
 
-    for pattern in price_patterns:
-        matches = re.findall(pattern, text)
-        for match in matches:
-            # Clean separators
-            clean_price = match
-            for sep in PRICE_SEPARATORS:
-                clean_price = clean_price.replace(sep, "")
+    for pattern in _PRICE_PATTERNS:
+        for match in pattern.finditer(text):
+            # Matches are digits and separators only, so this always parses
+            price = int(match.group(1).translate(_PRICE_SEPARATOR_TABLE))
+            if price > best_price:
+                best_price = price
 
-            try:
-                price = int(clean_price)
-                if price > 0:
-                    potential_prices.append(price)
-            except ValueError:
-                continue
-
-    if not potential_prices:
-        return 0
-
-    # Return the largest price found (assuming it's the main price)
-    return max(potential_prices)
+    return best_price
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def normalize_seller_name(seller_name: str) -> str:
     """
     Normalize seller name for deduplication.
@@ -146,27 +187,20 @@ def normalize_seller_name(seller_name: str) -> str:
     if not seller_name:
         return ""
 
-    # Convert to lowercase
-    name = seller_name.lower()
+    # Convert to lowercase and unify letter variants
+    name = seller_name.lower().translate(_LETTER_TABLE)
 
     # Clean whitespace
     name = clean_whitespace(name)
 
     # Remove common prefixes/suffixes
-    prefixes_to_remove = ["فروشگاه", "شرکت", "گروه", "مجموعه"]
-    suffixes_to_remove = ["store", "shop", "group", "co"]
-
-    for prefix in prefixes_to_remove:
-        if name.startswith(prefix):
-            name = name[len(prefix) :].strip()
-
-    for suffix in suffixes_to_remove:
-        if name.endswith(suffix):
-            name = name[: -len(suffix)].strip()
+    name = _SELLER_PREFIX_RE.sub("", name, count=1)
+    name = _SELLER_SUFFIX_RE.sub("", name, count=1)
 
-    return name
+    return name.strip()
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def normalize_part_title(title: str) -> str:
     """
     Normalize part title for comparison and deduplication.
@@ -183,14 +217,11 @@ def normalize_part_title(title: str) -> str:
     # Clean whitespace
     title = clean_whitespace(title)
 
-    # Convert to lowercase for comparison
-    title = title.lower()
+    # Convert to lowercase and unify letter variants for comparison
+    title = title.lower().translate(_LETTER_TABLE)
 
     # Remove common words that don't add value
-    noise_words = ["اصل", "اصلی", "یدکی", "قطعه", "پارت", "part", "oem", "original"]
-
-    for word in noise_words:
-        title = re.sub(rf"\b{re.escape(word)}\b", "", title, flags=re.IGNORECASE)
+    title = _NOISE_WORDS_RE.sub("", title)
 
     # Clean up multiple spaces
     title = clean_whitespace(title)
@@ -224,6 +255,7 @@ def convert_toman_to_rial(toman_amount: int) -> int:
     return toman_amount * 10
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def detect_currency_unit(text: str) -> str:
     """
     Detect if price is in Toman or Rial based on context.
@@ -234,18 +266,18 @@ def detect_currency_unit(text: str) -> str:
     Returns:
         'toman' or 'rial' or 'unknown'
     """
-    text_lower = text.lower()
-
-    toman_indicators = ["تومان", "تومن", "ﺗﻮﻣﺎﻥ"]
-    rial_indicators = ["ریال", "ریل", "ﺭﯾﺎﻝ"]
-
-    for indicator in toman_indicators:
-        if indicator in text_lower:
-            return "toman"
-
-    for indicator in rial_indicators:
-        if indicator in text_lower:
-            return "rial"
+    # The indicators are Persian script, so ASCII text can't contain one
+    if text.isascii():
+        return "unknown"
+
+    # Persian script has no case, so the text is only NFKC-normalized
+    # rather than lowercased first
+    text = unicodedata.normalize("NFKC", text)
+    if _TOMAN_INDICATORS_RE.search(text):
+        return "toman"
+
+    if _RIAL_INDICATORS_RE.search(text):
+        return "rial"
 
     return "unknown"
 
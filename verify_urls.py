@@ -6,6 +6,28 @@ Verify that URL columns are properly populated in the Excel file.
 import pandas as pd
 
 
+def _report_column(df: pd.DataFrame, col: str, show_samples: bool = False):
+    """
+    Print how many rows of a column have data, and optionally a few samples.
+
+    Args:
+        df: Sheet data
+        col: Column to check
+        show_samples: Also print the first 3 values that have data
+    """
+    if col not in df.columns:
+        print(f"   ❌ {col}: Column not found")
+        return
+
+    # One null check serves both the count and the samples
+    mask = df[col].notna()
+    print(f"   ✅ {col}: {int(mask.sum())}/{len(df)} rows have data")
+
+    if show_samples:
+        for i, data in enumerate(df.loc[mask, col].head(3)):
+            print(f"      [{i+1}] {str(data)[:80]}...")
+
+
 def verify_urls():
     """Check URL columns in the Excel file."""
     print("🔍 Verifying URL Columns in Excel File")
@@ -15,10 +37,12 @@ def verify_urls():
         # Read the Excel file
         excel_file = "torob_prices.xlsx"
 
-        # Read all sheets
-        offers_df = pd.read_excel(excel_file, sheet_name="offers_raw")
-        sellers_df = pd.read_excel(excel_file, sheet_name="sellers_summary")
-        parts_df = pd.read_excel(excel_file, sheet_name="part_summary")
+        # Read all sheets from one handle, so the workbook is only opened and
+        # unzipped once
+        with pd.ExcelFile(excel_file) as xl:
+            offers_df = pd.read_excel(xl, sheet_name="offers_raw")
+            sellers_df = pd.read_excel(xl, sheet_name="sellers_summary")
+            parts_df = pd.read_excel(xl, sheet_name="part_summary")
 
         print(f"📊 Excel file loaded successfully!")
         print(f"   - Offers: {len(offers_df)} rows")
@@ -32,39 +56,19 @@ def verify_urls():
         # Check URL columns
         url_columns = ["product_url", "seller_url", "validation_urls"]
         for col in url_columns:
-            if col in offers_df.columns:
-                non_empty = offers_df[col].notna().sum()
-                total = len(offers_df)
-                print(f"   ✅ {col}: {non_empty}/{total} rows have data")
-
-                # Show sample data
-                sample_data = offers_df[col].dropna().head(3)
-                for i, data in enumerate(sample_data):
-                    print(f"      [{i+1}] {str(data)[:80]}...")
-            else:
-                print(f"   ❌ {col}: Column not found")
+            _report_column(offers_df, col, show_samples=True)
 
         # Check sellers_summary sheet
         print(f"\n🔍 Checking 'sellers_summary' sheet:")
         url_columns = ["sample_urls", "validation_urls"]
         for col in url_columns:
-            if col in sellers_df.columns:
-                non_empty = sellers_df[col].notna().sum()
-                total = len(sellers_df)
-                print(f"   ✅ {col}: {non_empty}/{total} rows have data")
-            else:
-                print(f"   ❌ {col}: Column not found")
+            _report_column(sellers_df, col)
 
         # Check part_summary sheet
         print(f"\n🔍 Checking 'part_summary' sheet:")
         url_columns = ["sample_urls", "validation_urls"]
         for col in url_columns:
-            if col in parts_df.columns:
-                non_empty = parts_df[col].notna().sum()
-                total = len(parts_df)
-                print(f"   ✅ {col}: {non_empty}/{total} rows have data")
-            else:
-                print(f"   ❌ {col}: Column not found")
+            _report_column(parts_df, col)
 
         print(f"\n🎉 URL verification complete!")
         return True
@@ -5,10 +5,14 @@ Provides a modern web UI for easy scraping without command line.
 """
 
 import asyncio
+import builtins
+import io
 import json
 import os
 import threading
 import uuid
+import zipfile
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
@@ -23,20 +27,48 @@ from flask import (
     send_file,
     url_for,
 )
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
 
-from core.cli_enhancer import get_cli_enhancer
 from core.config_manager import get_config
-from core.pipeline_torob import TorobTwoStagePipeline
+from core.task_store import TaskStore
+
+# orjson serializes the task logs and lists several times faster; it's
+# optional (the "speed" extra)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
 
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = "torob_scraper_secret_key_2024"
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Configuration
 UPLOAD_FOLDER = "uploads"
 RESULTS_FOLDER = "results"
 ALLOWED_EXTENSIONS = {"csv", "xlsx", "xls"}
+TASKS_DB = os.path.join(RESULTS_FOLDER, "tasks.db")
+# Most recent log messages returned per task
+MAX_TASK_LOGS = 1000
 
 # Ensure directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -44,10 +76,17 @@ os.makedirs(RESULTS_FOLDER, exist_ok=True)
 os.makedirs("templates", exist_ok=True)
 os.makedirs("static", exist_ok=True)
 
-# Global state for running tasks
-running_tasks = {}
-task_results = {}
-task_logs = {}
+# Task state and logs, persisted so they survive restarts and are shared
+# by every server process
+task_store = TaskStore(TASKS_DB)
+
+# Scraping tasks all run on one event loop in a background thread, started
+# on the first task
+_scraping_loop = None
+_scraping_loop_lock = threading.Lock()
+# Task whose pipeline is running in the current context, for _task_print
+_current_task_id = ContextVar("current_task_id", default=None)
+_original_print = builtins.print
 
 
 def allowed_file(filename):
@@ -61,154 +100,126 @@ def parse_csv_file(file_path: str) -> List[Dict[str, Any]]:
 
     try:
         df = pd.read_csv(file_path)
-        parts_data = []
 
-        for index, row in df.iterrows():
-            part_data = {
-                "part_id": f"part_{index+1}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                "part_name": str(row.get("part_name", "")).strip(),
-                "part_code": str(row.get("part_code", "")).strip(),
-                "keywords": str(row.get("keywords", "")).strip(),
-            }
+        # Clean the columns as a whole rather than row by row
+        columns = ["part_name", "part_code", "keywords"]
+        df = df.reindex(columns=columns, fill_value="").fillna("")
+        for column in columns:
+            df[column] = df[column].astype(str).str.strip()
 
-            # Generate keywords if not provided
-            if not part_data["keywords"]:
-                part_data["keywords"] = f"{part_data['part_name']} automotive part"
+        # Generate keywords if not provided
+        df["keywords"] = df["keywords"].where(
+            df["keywords"] != "", df["part_name"] + " automotive part"
+        )
 
-            parts_data.append(part_data)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        df["part_id"] = "part_" + (df.index + 1).astype(str) + "_" + timestamp
 
-        return parts_data
+        return df[["part_id", *columns]].to_dict(orient="records")
     except Exception as e:
         raise Exception(f"Error parsing CSV file: {e}")
 
 
 def add_log(task_id: str, message: str, level: str = "info"):
     """Add log message to task."""
-    global task_logs
-    task_logs = task_logs  # Explicit assignment for flake8
-
-    if task_id not in task_logs:
-        task_logs[task_id] = []
-
-    task_logs[task_id].append(
-        {"message": message, "level": level, "timestamp": datetime.now().isoformat()}
-    )
-
-
-def run_scraping_task(
+    task_store.add_log(task_id, message, level)
+
+
+def _task_print(*args, **kwargs):
+    """print() replacement that also logs to the task running in this context."""
+    task_id = _current_task_id.get()
+    if task_id is not None:
+        message = " ".join(str(arg) for arg in args)
+        if "🔍" in message:
+            add_log(task_id, message, "search")
+        elif "📄" in message:
+            add_log(task_id, message, "drill")
+        elif "✅" in message or "✓" in message:
+            add_log(task_id, message, "success")
+        elif "⚠️" in message:
+            add_log(task_id, message, "warning")
+        elif "❌" in message:
+            add_log(task_id, message, "error")
+        elif "🔄" in message:
+            add_log(task_id, message, "processing")
+        elif "📊" in message or "Found" in message:
+            add_log(task_id, message, "found")
+        else:
+            add_log(task_id, message, "info")
+    _original_print(*args, **kwargs)
+
+
+def _get_scraping_loop() -> asyncio.AbstractEventLoop:
+    """Start (on first use) and return the event loop scraping tasks run on."""
+    global _scraping_loop
+
+    with _scraping_loop_lock:
+        if _scraping_loop is None:
+            # Installed once for good; it only logs while a task is current
+            builtins.print = _task_print
+
+            _scraping_loop = asyncio.new_event_loop()
+            threading.Thread(target=_scraping_loop.run_forever, daemon=True).start()
+        return _scraping_loop
+
+
+async def run_scraping_task(
     task_id: str, parts_data: List[Dict[str, Any]], excel_filename: str
 ):
-    """Run scraping task in background thread."""
-    global running_tasks, task_results, task_logs
-    # Explicit assignments for flake8
-    running_tasks = running_tasks
-    task_results = task_results
-    task_logs = task_logs
+    """Run scraping task on the background event loop."""
+    # Route the pipeline's printed output to this task's log. Every task runs
+    # in its own context, so concurrent tasks don't see each other's id.
+    _current_task_id.set(task_id)
 
     try:
-        running_tasks[task_id] = {
-            "status": "running",
-            "start_time": datetime.now(),
-            "progress": 0,
-            "message": "Initializing...",
-        }
-
-        # Initialize logs
-        task_logs[task_id] = []
+        task_store.start_task(task_id)
         add_log(task_id, "🚀 Starting Torob Scraper Pipeline", "info")
         add_log(task_id, f"📋 Processing {len(parts_data)} part(s)", "info")
 
-        # Create pipeline
+        # Create pipeline. Imported here so the server starts without loading
+        # playwright and pandas.
+        from core.pipeline_torob import TorobTwoStagePipeline
+
         add_log(task_id, "⚙️ Initializing scraper components...", "processing")
         pipeline = TorobTwoStagePipeline(parts_data, excel_filename)
 
-        # Add custom log handler to pipeline
-        original_print = print
-
-        def log_print(*args, **kwargs):
-            message = " ".join(str(arg) for arg in args)
-            if "🔍" in message:
-                add_log(task_id, message, "search")
-            elif "📄" in message:
-                add_log(task_id, message, "drill")
-            elif "✅" in message or "✓" in message:
-                add_log(task_id, message, "success")
-            elif "⚠️" in message:
-                add_log(task_id, message, "warning")
-            elif "❌" in message:
-                add_log(task_id, message, "error")
-            elif "🔄" in message:
-                add_log(task_id, message, "processing")
-            elif "📊" in message or "Found" in message:
-                add_log(task_id, message, "found")
-            else:
-                add_log(task_id, message, "info")
-            original_print(*args, **kwargs)
-
-        # Temporarily replace print function
-        import builtins
-
-        builtins.print = log_print
-
-        try:
-            # Run pipeline
-            add_log(task_id, "🌐 Starting web scraping...", "processing")
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            result = loop.run_until_complete(pipeline.run_pipeline())
-
-            # Restore original print
-            builtins.print = original_print
-
-            # Store results
-            task_results[task_id] = {
-                "status": "completed" if result else "failed",
-                "end_time": datetime.now(),
-                "excel_file": excel_filename,
-                "stats": pipeline.stats,
-            }
-
-            # Update running task
-            if task_id in running_tasks:
-                running_tasks[task_id]["status"] = "completed" if result else "failed"
-                running_tasks[task_id]["progress"] = 100
-                running_tasks[task_id]["message"] = (
-                    "Completed successfully!" if result else "Failed!"
-                )
-
-            if result:
-                add_log(task_id, "🎉 Scraping completed successfully!", "success")
-                add_log(
-                    task_id,
-                    f'📊 Found {pipeline.stats.get("final_offers", 0)} offers',
-                    "found",
-                )
-                add_log(
-                    task_id,
-                    f'🏪 From {pipeline.stats.get("unique_sellers", 0)} unique sellers',
-                    "found",
-                )
-            else:
-                add_log(task_id, "❌ Scraping failed!", "error")
-
-        finally:
-            # Always restore original print
-            builtins.print = original_print
+        # Run pipeline
+        add_log(task_id, "🌐 Starting web scraping...", "processing")
+        result = await pipeline.run_pipeline()
+
+        # Store results
+        task_store.finish_task(
+            task_id,
+            "completed" if result else "failed",
+            "Completed successfully!" if result else "Failed!",
+            excel_file=", ".join(pipeline.stats["output_files"]) or None,
+            stats=pipeline.stats,
+        )
+
+        if result:
+            add_log(task_id, "🎉 Scraping completed successfully!", "success")
+            add_log(
+                task_id,
+                f'📊 Found {pipeline.stats.get("final_offers", 0)} offers',
+                "found",
+            )
+            add_log(
+                task_id,
+                f'🏪 From {pipeline.stats.get("unique_sellers", 0)} unique sellers',
+                "found",
+            )
+        else:
+            add_log(task_id, "❌ Scraping failed!", "error")
 
     except Exception as e:
         # Handle errors
         add_log(task_id, f"❌ Critical error: {str(e)}", "error")
 
-        if task_id in running_tasks:
-            running_tasks[task_id]["status"] = "failed"
-            running_tasks[task_id]["message"] = f"Error: {str(e)}"
+        task_store.finish_task(task_id, "failed", f"Error: {str(e)}", error=str(e))
 
-        task_results[task_id] = {
-            "status": "failed",
-            "end_time": datetime.now(),
-            "error": str(e),
-        }
+    finally:
+        # Write out the last log lines rather than wait for the next batch
+        task_store.flush_logs()
 
 
 @app.route("/")
@@ -281,11 +292,9 @@ def start_scraping():
     )
 
     # Start background task
-    thread = threading.Thread(
-        target=run_scraping_task, args=(task_id, parts_data, excel_filename)
+    asyncio.run_coroutine_threadsafe(
+        run_scraping_task(task_id, parts_data, excel_filename), _get_scraping_loop()
     )
-    thread.daemon = True
-    thread.start()
 
     return jsonify(
         {
@@ -299,64 +308,65 @@ def start_scraping():
 @app.route("/api/task_status/<task_id>")
 def get_task_status(task_id):
     """Get task status."""
-    if task_id in running_tasks:
-        return jsonify(running_tasks[task_id])
-    elif task_id in task_results:
-        return jsonify(task_results[task_id])
-    else:
+    task = task_store.get_task(task_id)
+    if task is None:
         return jsonify({"error": "Task not found"}), 404
 
+    return jsonify(task)
+
 
 @app.route("/api/download/<task_id>")
 def download_results(task_id):
     """Download results file."""
-    if task_id not in task_results:
+    result = task_store.get_task(task_id)
+    if result is None:
         return jsonify({"error": "Task not found"}), 404
 
-    result = task_results[task_id]
     if result["status"] != "completed":
         return jsonify({"error": "Task not completed"}), 400
 
-    excel_file = result.get("excel_file")
-    if not excel_file or not os.path.exists(excel_file):
+    # Runs too large for one workbook are split over several files
+    output_files = result.get("stats", {}).get("output_files") or [
+        result.get("excel_file")
+    ]
+    if not all(path and os.path.exists(path) for path in output_files):
         return jsonify({"error": "Results file not found"}), 404
 
-    return send_file(excel_file, as_attachment=True)
+    if len(output_files) == 1:
+        return send_file(output_files[0], as_attachment=True)
+
+    # Send the parts together as one zip archive
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for path in output_files:
+            zf.write(path, os.path.basename(path))
+    archive.seek(0)
+    return send_file(
+        archive,
+        mimetype="application/zip",
+        as_attachment=True,
+        download_name=f"results_{task_id}.zip",
+    )
 
 
 @app.route("/api/tasks")
 def list_tasks():
     """List all tasks."""
-    all_tasks = {}
-    all_tasks.update(running_tasks)
-    all_tasks.update(task_results)
-    return jsonify(all_tasks)
+    return jsonify(task_store.list_tasks())
 
 
 @app.route("/api/task_logs/<task_id>")
 def get_task_logs(task_id):
     """Get task logs."""
-    if task_id not in task_logs:
-        return jsonify({"logs": []})
-
-    logs = task_logs[task_id]
+    logs = task_store.get_logs(task_id, limit=MAX_TASK_LOGS)
     return jsonify({"logs": logs})
 
 
 @app.route("/api/clear_tasks", methods=["POST"])
 def clear_tasks():
     """Clear completed tasks."""
-    global running_tasks, task_results, task_logs
-    # Explicit assignments for flake8
-    task_results = task_results
-    task_logs = task_logs
-
     # Keep only running tasks
-    running_tasks = {k: v for k, v in running_tasks.items() if v["status"] == "running"}
-
-    # Clear completed tasks
-    task_results.clear()
-    task_logs.clear()
+    task_store.clear_finished()
 
     return jsonify({"success": True, "message": "Tasks cleared"})
 